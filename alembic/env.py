@@ -6,6 +6,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from models.project import Project
 from models.task import Task
+from models.scheduler_lease import SchedulerLease
 from alembic import context
 
 # --- THIS IS THE CRITICAL PART ---
@@ -0,0 +1,62 @@
+"""Add task full text search
+
+Revision ID: 0a6d3c9e5b28
+Revises: f2b8e6a4c173
+Create Date: 2026-10-18 14:05:19.382716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d3c9e5b28'
+down_revision: Union[str, Sequence[str], None] = 'f2b8e6a4c173'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Must stay identical to models.task.SEARCH_DOCUMENT_SQL.
+        op.execute(
+            "CREATE INDEX ix_tasks_search ON tasks USING gin ("
+            "to_tsvector('simple', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, '')))"
+        )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+            "title, description, content='tasks', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+            "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+            "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+            "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        # Index the tasks that already exist.
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_tasks_search', table_name='tasks')
+    elif dialect == 'sqlite':
+        for trigger in ('tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
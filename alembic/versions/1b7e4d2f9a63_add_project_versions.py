@@ -0,0 +1,30 @@
+"""Add version counters to projects
+
+Revision ID: 1b7e4d2f9a63
+Revises: 0a6d3c9e5b28
+Create Date: 2026-10-18 15:22:41.907354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7e4d2f9a63'
+down_revision: Union[str, Sequence[str], None] = '0a6d3c9e5b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('tasks_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'tasks_version')
+    op.drop_column('projects', 'version')
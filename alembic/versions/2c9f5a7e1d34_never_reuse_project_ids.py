@@ -0,0 +1,38 @@
+"""Never reuse project ids on SQLite
+
+Revision ID: 2c9f5a7e1d34
+Revises: 1b7e4d2f9a63
+Create Date: 2026-10-18 18:10:12.481920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c9f5a7e1d34'
+down_revision: Union[str, Sequence[str], None] = '1b7e4d2f9a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The list ETags assume a deleted project's id never comes back.
+    # PostgreSQL's serial ids never do; SQLite reuses the highest id unless
+    # the table is declared AUTOINCREMENT, which needs a table rebuild.
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(
+            'projects', recreate='always', table_kwargs={'sqlite_autoincrement': True}
+        ):
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(
+            'projects', recreate='always', table_kwargs={'sqlite_autoincrement': False}
+        ):
+            pass
@@ -0,0 +1,33 @@
+"""Add task_count to projects
+
+Revision ID: c3a8d71e4f02
+Revises: b5e2f0c1a9d4
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8d71e4f02'
+down_revision: Union[str, Sequence[str], None] = 'b5e2f0c1a9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('task_count', sa.Integer(), server_default='0', nullable=False))
+    # Backfill the counter from the existing tasks.
+    op.execute(
+        "UPDATE projects SET task_count = "
+        "(SELECT count(*) FROM tasks WHERE tasks.project_id = projects.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'task_count')
@@ -0,0 +1,40 @@
+"""Cascade task deletes from projects
+
+Revision ID: d9f4b2a6c815
+Revises: c3a8d71e4f02
+Create Date: 2026-10-18 11:48:05.271634
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f4b2a6c815'
+down_revision: Union[str, Sequence[str], None] = 'c3a8d71e4f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite cannot alter constraints, so batch mode rebuilds the table there;
+# on PostgreSQL it emits the same ALTER TABLE statements as before. The
+# naming convention gives SQLite's unnamed foreign key the name PostgreSQL
+# generated, so both can drop it by that name.
+NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('tasks_project_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key(
+            'tasks_project_id_fkey', 'projects', ['project_id'], ['id'], ondelete='CASCADE'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('tasks_project_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('tasks_project_id_fkey', 'projects', ['project_id'], ['id'])
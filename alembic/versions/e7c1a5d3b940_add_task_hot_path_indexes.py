@@ -0,0 +1,34 @@
+"""Add task hot path indexes
+
+Revision ID: e7c1a5d3b940
+Revises: d9f4b2a6c815
+Create Date: 2026-10-18 12:30:51.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c1a5d3b940'
+down_revision: Union[str, Sequence[str], None] = 'd9f4b2a6c815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_project_id_id', 'tasks', ['project_id', 'id'], unique=False)
+    op.create_index(
+        'ix_tasks_open_deadline', 'tasks', ['deadline'], unique=False,
+        postgresql_where=sa.text("status <> 'DONE'"),
+        sqlite_where=sa.text("status <> 'DONE'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_open_deadline', table_name='tasks')
+    op.drop_index('ix_tasks_project_id_id', table_name='tasks')
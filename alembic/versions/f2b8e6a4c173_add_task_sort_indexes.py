@@ -0,0 +1,30 @@
+"""Add task sort indexes
+
+Revision ID: f2b8e6a4c173
+Revises: e7c1a5d3b940
+Create Date: 2026-10-18 13:17:42.663058
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8e6a4c173'
+down_revision: Union[str, Sequence[str], None] = 'e7c1a5d3b940'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_deadline_id', 'tasks', ['deadline', 'id'], unique=False)
+    op.create_index('ix_tasks_created_at_id', 'tasks', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_deadline_id', table_name='tasks')
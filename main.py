@@ -1,5 +1,6 @@
 from src.Task import * 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from src.CLI.parser import CLI 
 from src.CLI.commands import *
 
@@ -15,17 +16,30 @@ It would look like
 poetry run main.py create_task .... 
 """
 
-def run_api():
-    """Run the FastAPI server."""
-    import uvicorn
+def create_app() -> FastAPI:
+    """Build the FastAPI application."""
     from src.api.routers  import router
+    from src.api.metrics_router import router as metrics_router
+    from src.api.lifespan import lifespan
+    from src.api.middleware import QueryStatsMiddleware, RequestMetricsMiddleware
     app = FastAPI(
             title="TodoList API",
             description = "Manage your task and project with API",
-            version="1.0.0"
+            version="1.0.0",
+            lifespan=lifespan,
+            default_response_class=ORJSONResponse,
         )
+    app.add_middleware(QueryStatsMiddleware)
+    # Added last, so it is the outermost and times everything else.
+    app.add_middleware(RequestMetricsMiddleware)
     app.include_router(router, prefix="/api/v1")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    app.include_router(metrics_router, prefix="/api/v1")
+    return app
+
+def run_api():
+    """Run the FastAPI server."""
+    import uvicorn
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
 
 def main():
     """___Main___"""
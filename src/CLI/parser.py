@@ -1,8 +1,10 @@
-from db.session import get_db_session
+from db.session import session_scope
 from repositories.project_repository import ProjectRepository
 from repositories.task_repository import TaskRepository
 from services.project_service import ProjectService
 from services.task_service import TaskService
+from services.export_service import ExportService
+from commands.bulk_import import IMPORT_FORMATS, run_import
 from exceptions.service_exceptions import (
     ProjectServiceError,
     TaskServiceError,
@@ -32,6 +34,8 @@ class CLI:
             "list-tasks": self.list_tasks_for_project,
             "edit-task": self.edit_task,
             "delete-task": self.delete_task,
+            "export": self.export,
+            "import": self.import_file,
             "help": self.show_help,
             "exit": self.exit_cli,
         }
@@ -60,7 +64,7 @@ class CLI:
                 args = parts[1:]
 
                 if command_name in self.commands:
-                    with get_db_session() as db:
+                    with session_scope() as db:
                         project_repo = ProjectRepository(db)
                         task_repo = TaskRepository(db)
                         project_service = ProjectService(project_repo)
@@ -80,7 +84,7 @@ class CLI:
         finally:
             # This block ensures a graceful shutdown
             stop_background_scheduler()
-            # Wait for the background thread to finish its current sleep cycle and exit
+            # The scheduler wakes up immediately on shutdown, so this returns quickly
             scheduler_thread.join(timeout=2) 
             print("Goodbye!")
 
@@ -219,6 +223,52 @@ class CLI:
         except Exception as e:
             print(f"⚠️  Unexpected error: {str(e)}")
     
+    def export(self, args, project_service: ProjectService, _):
+        if len(args) not in (1, 2):
+            print("Usage: export <file> [ndjson|csv]")
+            return
+        fmt = args[1].lower() if len(args) > 1 else "ndjson"
+        if fmt not in ExportService.FORMATS:
+            print("⚠️  Export format must be 'ndjson' or 'csv'.")
+            return
+        try:
+            exporter = ExportService(project_service.project_repository)
+            with open(args[0], "w", newline="", encoding="utf-8") as f:
+                f.writelines(exporter.export(fmt))
+            print(f"✅ Exported projects and tasks to '{args[0]}' ({fmt}).")
+        except OSError as e:
+            print(f"⚠️  Could not write '{args[0]}': {str(e)}")
+        except Exception as e:
+            print(f"⚠️  Unexpected error: {str(e)}")
+    
+    def import_file(self, args, *_):
+        if len(args) not in (1, 2, 3):
+            print("Usage: import <file> [ndjson|csv] [resume_from]")
+            return
+        fmt = args[1].lower() if len(args) > 1 else "ndjson"
+        if fmt not in IMPORT_FORMATS:
+            print("⚠️  Import format must be 'ndjson' or 'csv'.")
+            return
+        try:
+            resume_from = int(args[2]) if len(args) > 2 else 0
+            # The import commits chunk by chunk in its own sessions.
+            with open(args[0], newline="", encoding="utf-8") as f:
+                report = run_import(f, fmt, resume_from)
+            print(f"✅ Imported {report['records']} record(s): {report['projects_created']} project(s), "
+                  f"{report['tasks_created']} task(s) in {report['seconds']}s "
+                  f"({report['tasks_per_second']} tasks/s), {report['rejected']} rejected.")
+            for error in report["errors"]:
+                print(f"   Record {error['record']}: {error['error']}")
+            if report["failed"]:
+                print(f"⚠️  Import stopped: {report['error']}")
+                print(f"   Fix the problem and run: import {args[0]} {fmt} {report['resume_from']}")
+        except ValueError:
+            print("⚠️  Invalid resume_from. Please enter a valid number.")
+        except OSError as e:
+            print(f"⚠️  Could not read '{args[0]}': {str(e)}")
+        except Exception as e:
+            print(f"⚠️  Unexpected error: {str(e)}")
+    
     def show_help(self, *args):
         print("\nAvailable commands:")
         print("  create-project <name> <description>             - Create a new project")
@@ -229,6 +279,8 @@ class CLI:
         print("  list-tasks <proj_id>                          - List tasks in a project")
         print("  edit-task <task_id> <title> <desc> ...        - Edit a task by its ID")
         print("  delete-task <task_id>                         - Delete a task by its ID")
+        print("  export <file> [ndjson|csv]                    - Export all projects and tasks")
+        print("  import <file> [ndjson|csv] [resume_from]      - Import projects and tasks")
         print("  help                                          - Show this help message")
         print("  exit                                          - Exit the application")
 
@@ -0,0 +1,30 @@
+"""
+Conditional GET helpers shared by the list endpoints.
+
+A list endpoint computes an ETag from a cheap change counter before loading
+anything. When the client's If-None-Match already has it, the endpoint
+answers 304 Not Modified with no body; otherwise it sends the list with the
+ETag header so the client can ask again conditionally.
+"""
+
+from fastapi import Request, Response, status
+
+ETAG_HEADER = "ETag"
+
+
+def make_etag(*parts) -> str:
+    """Builds a (strong) entity tag from the parts of a version."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag})
@@ -0,0 +1,76 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Literal, Optional
+
+from api.controller_schemas.requests.project_request_schema import ProjectPatchRequest
+from api.controller_schemas.requests.task_request_schema import TaskCreateRequest, TaskPatchRequest
+
+
+class BatchOperation(BaseModel):
+    """
+    Schema for one operation of a batch request. `data` takes the same
+    fields as the single create/edit/patch endpoint of the target; it is
+    checked per operation against BATCH_DATA_SCHEMAS.
+    """
+    target: Literal["project", "task"]
+    op: Literal["create", "edit", "patch", "delete"]
+    id: Optional[int] = None
+    data: dict = {}
+
+
+class BatchRequest(BaseModel):
+    """
+    Schema for a batch request. With `atomic`, the first failing operation
+    rolls back the whole batch.
+    """
+    operations: List[BatchOperation]
+    atomic: bool = False
+
+
+# The `data` of each kind of operation. Unknown fields are rejected, so a
+# batch can only set what the single endpoints let a client set.
+class BatchProjectCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    name: str
+    description: str = ""
+
+
+class BatchProjectEdit(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    name: str
+    description: Optional[str] = None
+
+
+class BatchProjectPatch(ProjectPatchRequest):
+    model_config = ConfigDict(extra="forbid")
+
+
+class BatchTaskCreate(TaskCreateRequest):
+    model_config = ConfigDict(extra="forbid")
+
+
+class BatchTaskEdit(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    title: str
+    description: str = ""
+    deadline: Optional[str] = None
+    status: str = "todo"
+
+
+class BatchTaskPatch(TaskPatchRequest):
+    model_config = ConfigDict(extra="forbid")
+
+
+class BatchNoData(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+BATCH_DATA_SCHEMAS = {
+    ("project", "create"): BatchProjectCreate,
+    ("project", "edit"): BatchProjectEdit,
+    ("project", "patch"): BatchProjectPatch,
+    ("project", "delete"): BatchNoData,
+    ("task", "create"): BatchTaskCreate,
+    ("task", "edit"): BatchTaskEdit,
+    ("task", "patch"): BatchTaskPatch,
+    ("task", "delete"): BatchNoData,
+}
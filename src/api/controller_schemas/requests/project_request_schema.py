@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ProjectPatchRequest(BaseModel):
+    """
+    Schema for a partial project update: only the fields that are sent are changed
+    """
+    name: Optional[str] = None
+    description: Optional[str] = None
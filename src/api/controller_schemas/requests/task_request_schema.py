@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class TaskCreateRequest(BaseModel):
+    """
+    Schema for one task of a bulk creation request
+    """
+    project_id: int
+    title: str
+    description: Optional[str] = None
+    deadline: Optional[str] = None
+    status: str = "todo"
+
+
+class TaskPatchRequest(BaseModel):
+    """
+    Schema for a partial task update: only the fields that are sent are
+    changed (send "deadline": null to remove the deadline)
+    """
+    title: Optional[str] = None
+    description: Optional[str] = None
+    deadline: Optional[str] = None
+    status: Optional[str] = None
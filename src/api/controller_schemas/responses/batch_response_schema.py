@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from api.controller_schemas.responses.project_response_schema import ProjectResponse
+from api.controller_schemas.responses.task_response_schema import TaskResponse
+
+
+class BatchOperationResult(BaseModel):
+    """
+    Schema for the outcome of one batch operation: the project or task it
+    created, edited or deleted, or why it did not apply
+    """
+    index: int
+    project: Optional[ProjectResponse] = None
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """
+    Schema for a batch response. `committed` is false when an atomic batch
+    was rolled back.
+    """
+    committed: bool
+    results: List[BatchOperationResult]
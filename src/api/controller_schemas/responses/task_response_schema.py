@@ -24,4 +24,21 @@ class TaskResponse(BaseModel):
     project_id: int
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TaskSearchResponse(TaskResponse):
+    """
+    Schema for a task search hit, with its relevance (higher is better)
+    """
+    rank: float
+
+
+class TaskBulkResult(BaseModel):
+    """
+    Schema for the outcome of one item of a bulk creation request:
+    the created task, or the reason it was rejected
+    """
+    index: int
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
@@ -1,4 +1,5 @@
 from typing import Optional
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 from models.user import User
 from services.user_service import UserService
@@ -38,6 +39,17 @@ class UserController:
         
         return user, access_token
 
+    def get_current_user(self, token: str) -> Optional[Row]:
+        """
+        Resolve the active user a bearer token belongs to. Both the token and
+        the user come from caches in the common case, so this usually costs
+        no JWT decoding and no query.
+        """
+        payload = self.auth_service.verify_token(token)
+        if not payload or payload.get("user_id") is None:
+            return None
+        return self.user_service.get_active_user(payload["user_id"])
+
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """
         Get user by ID
@@ -0,0 +1,30 @@
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+
+from db.pool import DB_POOL_WARMUP, warm_up_async
+from db.session import async_engine
+from commands.autoclose_overdue import start_async_scheduler, stop_async_scheduler
+from services.password_hasher import password_hasher
+
+# Every API worker runs its own overdue scheduler unless this is turned off.
+RUN_OVERDUE_SCHEDULER = os.getenv("RUN_OVERDUE_SCHEDULER", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown of the API: pre-opens pooled connections and runs
+    the overdue scheduler next to the API for the app's lifetime. On the
+    way out it also stops the password hashing workers.
+    """
+    if DB_POOL_WARMUP:
+        opened = await warm_up_async(async_engine, DB_POOL_WARMUP)
+        print(f"[API]: Warmed up {opened} database connection(s).")
+    scheduler_task = start_async_scheduler() if RUN_OVERDUE_SCHEDULER else None
+    try:
+        yield
+    finally:
+        if scheduler_task is not None:
+            await stop_async_scheduler(scheduler_task)
+        password_hasher.shutdown()
@@ -0,0 +1,39 @@
+"""
+Operational endpoints for looking at the running API.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from cache.listing_cache import listing_cache
+from db.session import pool_metrics
+from monitoring.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Request latency histograms and error counts per route, scheduler sweep
+    durations and closed tasks, and pool gauges, in the Prometheus text
+    format, for scraping.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/metrics/pool")
+async def get_pool_metrics():
+    """
+    Connection pool gauges (size, checked out, overflow) and the time
+    callers spent waiting for a connection, for the sync and async engines.
+    """
+    return pool_metrics()
+
+
+@router.get("/metrics/cache")
+async def get_cache_metrics():
+    """
+    Hit/miss counters of the project and task listing cache.
+    """
+    return listing_cache.stats()
@@ -0,0 +1,98 @@
+"""
+ASGI middleware of the API, added to the app in main.create_app.
+"""
+
+import time
+
+from db.instrumentation import N_PLUS_ONE_THRESHOLD, SQL_DEBUG_HEADERS, QueryStats, track_queries
+from monitoring.metrics import HTTP_REQUEST_DURATION, HTTP_REQUEST_ERRORS
+
+# Route label of requests that matched no route, so unknown paths do not
+# each get their own series.
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Longest slowest-statement text put in the X-DB-Slowest-Query header.
+SLOWEST_QUERY_HEADER_LENGTH = 200
+
+
+class QueryStatsMiddleware:
+    """
+    Tracks the SQL statements of each request (see db.instrumentation).
+
+    With SQL_DEBUG_HEADERS, the response gets X-DB-Query-Count, X-DB-Time-Ms,
+    X-DB-Slowest-Ms and X-DB-Slowest-Query. Headers go out before a streamed
+    body, so for streaming responses they only cover the work done until then.
+
+    With N_PLUS_ONE_THRESHOLD, a warning is printed after the request for
+    every statement shape that ran more than that many times.
+
+    When neither is enabled, requests pass straight through.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.enabled = SQL_DEBUG_HEADERS or N_PLUS_ONE_THRESHOLD > 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start" and SQL_DEBUG_HEADERS:
+                    message["headers"] = [*message.get("headers", []), *self._headers(stats)]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                if N_PLUS_ONE_THRESHOLD:
+                    for shape, count in stats.repeated_shapes():
+                        print(f"[SQL]: Possible N+1 in {scope['method']} {scope['path']}: "
+                              f"{count} x {shape}")
+
+    @staticmethod
+    def _headers(stats: QueryStats) -> list[tuple[bytes, bytes]]:
+        headers = [
+            (b"x-db-query-count", str(stats.count).encode()),
+            (b"x-db-time-ms", f"{stats.total_seconds * 1000:.2f}".encode()),
+            (b"x-db-slowest-ms", f"{stats.slowest_seconds * 1000:.2f}".encode()),
+        ]
+        if stats.slowest_statement:
+            statement = " ".join(stats.slowest_statement.split())[:SLOWEST_QUERY_HEADER_LENGTH]
+            headers.append((b"x-db-slowest-query", statement.encode("latin-1", errors="replace")))
+        return headers
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the latency of every request in HTTP_REQUEST_DURATION and the
+    4xx/5xx responses in HTTP_REQUEST_ERRORS, labelled with the route
+    template (e.g. /api/v1/tasks/{task_id}) rather than the raw path.
+    An exception escaping the app counts as a 500.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": route.path if route else UNMATCHED_ROUTE}
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, **labels)
+            if status >= 400:
+                HTTP_REQUEST_ERRORS.inc(**labels, status=status)
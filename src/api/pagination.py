@@ -0,0 +1,71 @@
+"""
+Cursor (keyset) pagination helpers shared by the list endpoints.
+
+A cursor is an opaque, URL-safe token. Clients get it from the X-Next-Cursor
+response header and send it back as `?cursor=` to fetch the next page; the
+header is absent on the last page.
+"""
+
+import base64
+import json
+import os
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Response, status
+from dotenv import load_dotenv
+
+load_dotenv()
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def encode_cursor(position: dict) -> str:
+    """Packs a position (e.g. {"after_id": 42}) into an opaque cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> dict:
+    """Unpacks a cursor produced by encode_cursor. No cursor means the first page."""
+    if not cursor:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except ValueError:
+        position = None
+    if not isinstance(position, dict):
+        raise invalid_cursor()
+    return position
+
+
+def after_id_from(cursor: Optional[str]) -> Optional[int]:
+    """The id to continue after, for cursors over id-ordered lists."""
+    after_id = decode_cursor(cursor).get("after_id")
+    if after_id is not None and not isinstance(after_id, int):
+        raise invalid_cursor()
+    return after_id
+
+
+def paginate(
+    items: list,
+    limit: int,
+    response: Response,
+    position: Callable[[object], dict] = lambda item: {"after_id": item.id},
+) -> list:
+    """
+    Trims a list fetched with `limit + 1` rows to one page and, when there is
+    a next page, sets its cursor on the response. `position` turns the last
+    item of the page into what the cursor must remember.
+    """
+    if len(items) <= limit:
+        return items
+    page = items[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(position(page[-1]))
+    return page
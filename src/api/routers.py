@@ -3,45 +3,85 @@ API Router for the Todo List Application
 
 This module defines the API endpoints that map to the existing CLI functionality.
 Each endpoint corresponds to a command that was previously available in the CLI parser.
+
+The endpoints are `async def` and use an AsyncSession. The services are plain
+synchronous code shared with the CLI, so each endpoint runs its service call
+on the session with `await db.run_sync(...)`.
 """
 
-from fastapi import APIRouter, Depends
+import io
+import tempfile
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
-from db.session import get_db_session
+from db.session import get_async_db_session, session_scope
 from models.project import Project
-from models.task import Task
+from repositories.project_repository import ProjectRepository
+from repositories.task_repository import TaskRepository
 from services.project_service import ProjectService
 from services.task_service import TaskService
+from services.export_service import ExportService
+from services.batch_service import MAX_BATCH_OPERATIONS, BatchService
+from commands.bulk_import import run_import
 from api.controller_schemas.responses.project_response_schema import ProjectResponse
-from api.controller_schemas.responses.task_response_schema import TaskResponse
+from api.controller_schemas.requests.task_request_schema import TaskCreateRequest, TaskPatchRequest
+from api.controller_schemas.requests.project_request_schema import ProjectPatchRequest
+from api.controller_schemas.requests.batch_request_schema import BATCH_DATA_SCHEMAS, BatchRequest
+from api.controller_schemas.responses.batch_response_schema import BatchOperationResult, BatchResponse
+from api.controller_schemas.responses.task_response_schema import (
+    TaskBulkResult,
+    TaskResponse,
+    TaskSearchResponse,
+)
+from api.serialization import rows_response
+from api.conditional import ETAG_HEADER, is_fresh, make_etag, not_modified
+from api.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    after_id_from,
+    decode_cursor,
+    invalid_cursor,
+    paginate,
+)
 
 router = APIRouter()
 
-def get_project_service(db: Session = Depends(get_db_session)) -> ProjectService:
-    """Dependency to get project service instance with repository"""
-    from repositories.project_repository import ProjectRepository
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Import bodies larger than this are spooled to a temporary file.
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+def get_project_service(db: Session) -> ProjectService:
+    """Builds a project service instance with its repository"""
     project_repo = ProjectRepository(db)
     return ProjectService(project_repo)
 
 
-def get_task_service(db: Session = Depends(get_db_session)) -> TaskService:
-    """Dependency to get task service instance with repositories"""
-    from repositories.task_repository import TaskRepository
-    from repositories.project_repository import ProjectRepository
+def get_task_service(db: Session) -> TaskService:
+    """Builds a task service instance with its repositories"""
     task_repo = TaskRepository(db)
     project_repo = ProjectRepository(db)
     return TaskService(task_repo, project_repo)
 
 
+def get_batch_service(db: Session) -> BatchService:
+    """Builds a batch service instance with the project and task services"""
+    return BatchService(get_project_service(db), get_task_service(db))
+
+
 # Project Management Endpoints
 # Corresponds to CLI command: create-project <name> <description>
 @router.post("/projects", response_model=ProjectResponse)
-def create_project(
+async def create_project(
     name: str,
     description: str,
-    project_service: ProjectService = Depends(get_project_service)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Create a new project with name and description
@@ -51,28 +91,45 @@ def create_project(
         "name": name,
         "description": description
     }
-    return project_service.create_project(data)
+    return await db.run_sync(lambda session: get_project_service(session).create_project(data))
 
 
 # Corresponds to CLI command: list-projects
 @router.get("/projects", response_model=List[ProjectResponse])
-def list_projects(
-    project_service: ProjectService = Depends(get_project_service)
+async def list_projects(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
-    List all projects
+    List projects, one page at a time (the next cursor is in X-Next-Cursor).
+    Supports If-None-Match with the returned ETag.
     CLI equivalent: list-projects
     """
-    return project_service.list_projects()
+    after_id = after_id_from(cursor)
+    # The same version keys the cached page, so the body always matches the ETag.
+    version = await db.run_sync(lambda session: get_project_service(session).list_version())
+    etag = make_etag(*version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    projects = await db.run_sync(
+        lambda session: get_project_service(session).list_projects(
+            after_id=after_id, limit=limit + 1, version=version
+        )
+    )
+    return rows_response(paginate(projects, limit, response), response)
 
 
 # Corresponds to CLI command: edit-project <id> <new_name> <new_desc>
 @router.put("/projects/{project_id}", response_model=ProjectResponse)
-def edit_project(
+async def edit_project(
     project_id: int,
     name: str,
     description: str,
-    project_service: ProjectService = Depends(get_project_service)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Edit an existing project by ID
@@ -82,32 +139,48 @@ def edit_project(
         "name": name,
         "description": description
     }
-    return project_service.edit_project(project_id, update_data)
+    return await db.run_sync(
+        lambda session: get_project_service(session).edit_project(project_id, update_data)
+    )
+
+
+# No CLI equivalent: changes only the fields that are sent
+@router.patch("/projects/{project_id}", response_model=ProjectResponse)
+async def patch_project(
+    project_id: int,
+    changes: ProjectPatchRequest,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Partially update a project by ID
+    """
+    data = changes.model_dump(exclude_unset=True)
+    return await db.run_sync(lambda session: get_project_service(session).patch_project(project_id, data))
 
 
 # Corresponds to CLI command: delete-project <id>
 @router.delete("/projects/{project_id}", response_model=ProjectResponse)
-def delete_project(
+async def delete_project(
     project_id: int,
-    project_service: ProjectService = Depends(get_project_service)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Delete a project by ID
     CLI equivalent: delete-project <id>
     """
-    return project_service.delete_project(project_id)
+    return await db.run_sync(lambda session: get_project_service(session).delete_project(project_id))
 
 
 # Task Management Endpoints
 # Corresponds to CLI command: create-task <project_id> <title> <description> [deadline YYYY-MM-DD] [status]
 @router.post("/tasks", response_model=TaskResponse)
-def create_task(
+async def create_task(
     project_id: int,
     title: str,
     description: str,
     deadline: str = None,
     status: str = "todo",
-    task_service: TaskService = Depends(get_task_service)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Create a new task in a project
@@ -120,31 +193,148 @@ def create_task(
         "deadline": deadline,
         "status": status
     }
-    return task_service.create_task(data)
+    return await db.run_sync(lambda session: get_task_service(session).create_task(data))
+
+
+# No CLI equivalent: creates many tasks at once, for importers
+@router.post("/tasks:bulk", response_model=List[TaskBulkResult])
+async def create_tasks(
+    items: List[TaskCreateRequest],
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Create many tasks in one transaction. Each item is accepted or rejected
+    on its own; the result for each item says which, in request order.
+    """
+    data = [item.model_dump() for item in items]
+    results = await db.run_sync(lambda session: get_task_service(session).create_tasks(data))
+    return [
+        TaskBulkResult(index=index, error=str(result))
+        if isinstance(result, Exception)
+        else TaskBulkResult(index=index, task=TaskResponse.model_validate(result))
+        for index, result in enumerate(results)
+    ]
 
 
 # Corresponds to CLI command: list-tasks <project_id>
 @router.get("/projects/{project_id}/tasks", response_model=List[TaskResponse])
-def list_tasks_for_project(
+async def list_tasks_for_project(
     project_id: int,
-    task_service: TaskService = Depends(get_task_service)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
-    List all tasks for a specific project
+    List the tasks of a specific project, one page at a time (the next
+    cursor is in X-Next-Cursor). Supports If-None-Match with the returned
+    ETag: a 304 costs one primary key lookup of the project.
     CLI equivalent: list-tasks <project_id>
     """
-    return task_service.list_tasks_for_project(project_id)
+    after_id = after_id_from(cursor)
+    # Read before the list: if a write lands in between, the ETag is older
+    # than the content and the next poll simply gets a full response. The
+    # same version keys the cached page, so a cached body always matches it.
+    version = await db.run_sync(lambda session: get_task_service(session).tasks_version(project_id))
+    etag = make_etag(project_id, version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    tasks = await db.run_sync(
+        lambda session: get_task_service(session).list_tasks_for_project(
+            project_id, after_id=after_id, limit=limit + 1, version=version
+        )
+    )
+    return rows_response(paginate(tasks, limit, response), response)
+
+
+# No CLI equivalent: filtered and sorted task query across projects
+@router.get("/tasks", response_model=List[TaskResponse])
+async def query_tasks(
+    response: Response,
+    status: Optional[List[str]] = Query(None),
+    project_id: Optional[List[int]] = Query(None),
+    deadline_from: Optional[datetime] = None,
+    deadline_to: Optional[datetime] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: Literal["id", "deadline", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Query tasks by status, project, deadline range and creation range, sorted
+    by id, deadline or created_at. Repeat `status`/`project_id` to pass several
+    values. Filtering, sorting and paging all happen in one SQL query; the
+    next cursor is in X-Next-Cursor.
+    """
+    position = decode_cursor(cursor)
+    after = None
+    if position:
+        # A cursor only makes sense for the ordering it was issued for.
+        if position.get("sort") != sort or position.get("order") != order:
+            raise invalid_cursor()
+        try:
+            value, last_id = position["after"]
+            after = (datetime.fromisoformat(value) if value is not None else None, int(last_id))
+        except (KeyError, TypeError, ValueError):
+            raise invalid_cursor()
+
+    filters = {
+        "statuses": status,
+        "project_ids": project_id,
+        "deadline_from": deadline_from,
+        "deadline_to": deadline_to,
+        "created_from": created_from,
+        "created_to": created_to,
+        "sort_by": sort,
+        "descending": order == "desc",
+        "after": after,
+        "limit": limit + 1,
+    }
+    tasks = await db.run_sync(lambda session: get_task_service(session).query_tasks(filters))
+
+    def task_position(task: Row) -> dict:
+        value = getattr(task, sort) if sort != "id" else None
+        return {
+            "sort": sort,
+            "order": order,
+            "after": [value.isoformat() if value is not None else None, task.id],
+        }
+
+    return rows_response(paginate(tasks, limit, response, position=task_position), response)
+
+
+# No CLI equivalent: full-text search over tasks
+@router.get("/tasks/search", response_model=List[TaskSearchResponse])
+async def search_tasks(
+    q: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Search task titles, descriptions and project names, best match first
+    (SEARCH_RESULT_LIMIT hits unless `limit` is given)
+    """
+    hits = await db.run_sync(lambda session: get_task_service(session).search_tasks(q, limit=limit))
+    return rows_response(
+        [task for task, _ in hits], response, rank=[rank for _, rank in hits]
+    )
 
 
 # Corresponds to CLI command: edit-task <task_id> <new_title> <new_desc> <new_deadline> <new_status>
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
-def edit_task(
+async def edit_task(
     task_id: int,
     title: str,
     description: str,
     deadline: str = None,
     status: str = "todo",
-    task_service: TaskService = Depends(get_task_service)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Edit an existing task by ID
@@ -156,17 +346,138 @@ def edit_task(
         "deadline": deadline,
         "status": status
     }
-    return task_service.edit_task(task_id, update_data)
+    return await db.run_sync(lambda session: get_task_service(session).edit_task(task_id, update_data))
+
+
+# No CLI equivalent: changes only the fields that are sent
+@router.patch("/tasks/{task_id}", response_model=TaskResponse)
+async def patch_task(
+    task_id: int,
+    changes: TaskPatchRequest,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Partially update a task by ID. Sending only a status is the cheapest
+    write: one UPDATE, with closed_at set when the task becomes done.
+    """
+    data = changes.model_dump(exclude_unset=True)
+    return await db.run_sync(lambda session: get_task_service(session).patch_task(task_id, data))
 
 
 # Corresponds to CLI command: delete-task <task_id>
 @router.delete("/tasks/{task_id}", response_model=TaskResponse)
-def delete_task(
+async def delete_task(
     task_id: int,
-    task_service: TaskService = Depends(get_task_service)
+    db: AsyncSession = Depends(get_async_db_session)
 ):
     """
     Delete a task by ID
     CLI equivalent: delete-task <task_id>
     """
-    return task_service.delete_task(task_id)
\ No newline at end of file
+    return await db.run_sync(lambda session: get_task_service(session).delete_task(task_id))
+
+
+# No CLI equivalent: many project/task changes in one transaction
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    db: AsyncSession = Depends(get_async_db_session)
+):
+    """
+    Create, edit and delete projects and tasks in one transaction with a
+    single commit. The result of each operation is reported in request
+    order; see BatchService.run for what happens when one fails.
+    """
+    if len(batch.operations) > MAX_BATCH_OPERATIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch can have at most {MAX_BATCH_OPERATIONS} operations.",
+        )
+    operations = [operation.model_dump() for operation in batch.operations]
+
+    def run(session: Session) -> BatchResponse:
+        committed, results = get_batch_service(session).run(
+            operations, atomic=batch.atomic, present=present_batch_item, validate=validate_batch_data
+        )
+        return BatchResponse(committed=committed, results=[
+            batch_result(index, result) for index, result in enumerate(results)
+        ])
+
+    response = await db.run_sync(run)
+    if not response.committed:
+        failed = next(result.index for result in response.results if result.error)
+        for result in response.results:
+            if result.index != failed:
+                result.error = "Rolled back with the batch." if result.index < failed else "Not run."
+    return response
+
+
+def validate_batch_data(target: str, op: str, data: dict) -> dict:
+    """
+    Checks the data of a batch operation against the schema of its
+    (target, op); a failure becomes that operation's error
+    """
+    try:
+        payload = BATCH_DATA_SCHEMAS[(target, op)].model_validate(data)
+    except ValidationError as e:
+        details = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'data'}: {error['msg']}" for error in e.errors()
+        )
+        raise ValueError(f"Invalid data: {details}")
+    # A patch only changes the fields that were sent.
+    return payload.model_dump(exclude_unset=op == "patch")
+
+
+def present_batch_item(target: str, item) -> dict:
+    """Serializes the object of a batch operation as that operation left it"""
+    if target == "project":
+        return {"project": ProjectResponse.model_validate(item)}
+    return {"task": TaskResponse.model_validate(item)}
+
+
+def batch_result(index: int, result) -> BatchOperationResult:
+    """The response entry of one batch operation"""
+    if isinstance(result, Exception):
+        return BatchOperationResult(index=index, error=str(result))
+    return BatchOperationResult(index=index, **(result or {}))
+
+
+# Corresponds to CLI command: export <file> [ndjson|csv]
+@router.get("/export")
+def export_projects(format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    Stream every project with its tasks as NDJSON (one project per line)
+    or CSV (one task per line)
+    CLI equivalent: export <file> [ndjson|csv]
+    """
+    def stream():
+        # The session has to live as long as the response body, so the
+        # generator opens its own; Starlette runs it in a worker thread.
+        with session_scope() as db:
+            yield from ExportService(ProjectRepository(db)).export(format)
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="export.{format}"'},
+    )
+
+
+# Corresponds to CLI command: import <file> [ndjson|csv] [resume_from]
+@router.post("/import")
+async def import_projects(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    resume_from: int = Query(0, ge=0),
+):
+    """
+    Import projects and tasks from a request body in the export format,
+    in chunks; the report says where to resume if a chunk failed
+    CLI equivalent: import <file> [ndjson|csv] [resume_from]
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        lines = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        return await run_in_threadpool(run_import, lines, format, resume_from)
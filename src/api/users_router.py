@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -9,12 +10,28 @@ from api.controller_schemas.responses.users_response_schema import UserResponse,
 from models.user import User
 
 router = APIRouter()
+bearer_scheme = HTTPBearer(auto_error=False)
 
 def get_user_controller(db: Session = Depends(get_db_session)) -> UserController:
     """Dependency to get user controller instance"""
     return UserController(db)
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    user_controller: UserController = Depends(get_user_controller)
+):
+    """Dependency resolving the active user of the request's bearer token"""
+    user = user_controller.get_current_user(credentials.credentials) if credentials else None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
 @router.post("/users/register", response_model=UserResponse)
 def register_user(
     user_data: UserCreateRequest,
@@ -58,6 +75,14 @@ def login_user(
     )
 
 
+@router.get("/users/me", response_model=UserResponse)
+def get_me(current_user=Depends(get_current_user)):
+    """
+    Get the user of the access token
+    """
+    return current_user
+
+
 @router.get("/users/{user_id}", response_model=UserResponse)
 def get_user(
     user_id: int,
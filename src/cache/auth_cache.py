@@ -0,0 +1,109 @@
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Hashable, Optional
+from dotenv import load_dotenv
+from sqlalchemy import Row, event
+from sqlalchemy.orm import Session
+from cache.backends import MISSING, CacheBackend, LRUTTLCache
+
+load_dotenv()
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+
+# Session.info key of the users a session has invalidated.
+_PENDING_KEY = "invalidated_users"
+
+
+class TokenCache:
+    """
+    Verified JWT payloads by token, so a token is decoded and its signature
+    checked once instead of on every request. An entry expires with the
+    token's own `exp` claim; tokens without one are not cached. Only tokens
+    that passed verification are ever stored.
+    """
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def get(self, token: str) -> Optional[dict]:
+        """The cached payload of `token`, or None if it has not been verified (or has expired)."""
+        payload = self.backend.get(token)
+        # A copy, so callers cannot change the shared entry.
+        return None if payload is MISSING else dict(payload)
+
+    def put(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        ttl = expires_at - time.time()
+        if ttl > 0:
+            self.backend.set(token, dict(payload), ttl=ttl)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+class ActiveUserCache:
+    """
+    The profile rows of active users by id (None for unknown or inactive
+    users), for resolving the user of an authenticated request without a
+    query.
+
+    Entries live for a short TTL. UserService also invalidates a user when
+    it changes or deletes them: right away and again when the session
+    commits or rolls back. Entries are keyed by the user's generation,
+    which an invalidation moves on: a load that read the old row and stores
+    it after the invalidation stores it under the old generation, so it is
+    never served. The cached values are plain rows,
+    never ORM objects, so they can be shared between sessions and threads.
+    """
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._generations: dict[Hashable, int] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get_or_load(self, user_id: Hashable, load: Callable[[], Optional[Row]]) -> Optional[Row]:
+        """Returns the cached row of `user_id`, or calls `load` and caches its result."""
+        key = (user_id, self._generation(user_id))
+        row = self.backend.get(key)
+        if row is MISSING:
+            row = load()
+            self.backend.set(key, row)
+        return row
+
+    def invalidate(self, user_id: Hashable, session: Session | None = None) -> None:
+        """Drops the cached row of `user_id`, and again once `session` ends its transaction."""
+        self._bump(user_id)
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, set()).add((self, user_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations.clear()
+        self.backend.clear()
+
+    def _generation(self, user_id: Hashable) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def _bump(self, user_id: Hashable) -> None:
+        # From one counter, so a user never gets back a generation used before.
+        with self._lock:
+            self._generations[user_id] = next(self._counter)
+
+
+def _invalidate_pending(session: Session) -> None:
+    for cache, user_id in session.info.pop(_PENDING_KEY, ()):
+        cache._bump(user_id)
+
+event.listen(Session, "after_commit", _invalidate_pending)
+event.listen(Session, "after_rollback", _invalidate_pending)
+
+# The caches shared by the services of this process.
+token_cache = TokenCache(LRUTTLCache(max_entries=TOKEN_CACHE_MAX_ENTRIES))
+active_user_cache = ActiveUserCache(
+    LRUTTLCache(max_entries=USER_CACHE_MAX_ENTRIES, ttl=USER_CACHE_TTL_SECONDS)
+)
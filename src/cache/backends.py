@@ -0,0 +1,73 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Returned by CacheBackend.get on a miss, so None can be cached.
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """
+    The interface of a cache store. Backends only store values; what to
+    cache and when to invalidate is decided by the caller (see ListingCache).
+    """
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """Returns the cached value, or MISSING."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Stores a value; `ttl` overrides the backend's default lifetime for it."""
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        """Drops a value, if it is cached."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every value."""
+
+
+class LRUTTLCache(CacheBackend):
+    """
+    An in-process backend: at most `max_entries` values, each kept for at
+    most `ttl` seconds (or its own ttl, see set), the least recently used
+    evicted first. Thread-safe.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,114 @@
+import os
+import threading
+from typing import Callable, Hashable
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from cache.backends import MISSING, CacheBackend, LRUTTLCache
+
+load_dotenv()
+LISTING_CACHE_ENABLED = os.getenv("LISTING_CACHE_ENABLED", "true").lower() == "true"
+LISTING_CACHE_MAX_ENTRIES = int(os.getenv("LISTING_CACHE_MAX_ENTRIES", 1024))
+LISTING_CACHE_TTL_SECONDS = float(os.getenv("LISTING_CACHE_TTL_SECONDS", 30))
+
+# Scope of the project list. The task list of a project is scoped by its id.
+PROJECTS = "projects"
+
+# Session.info key of the scopes a session has changed.
+_PENDING_KEY = "invalidated_listings"
+
+
+class ListingCache:
+    """
+    A read-through cache for the project list and the task list of each
+    project, between the services and the repositories.
+
+    Entries are keyed by scope (PROJECTS or a project id), the scope's
+    version in the database (ProjectRepository.list_version/tasks_version,
+    the same value the list ETags are made of) and the page parameters. A
+    committed write moves the version on, in every process at once, so a
+    page is only ever served for the version it was loaded at; entries of
+    old versions are never looked up again and age out of the backend.
+
+    The version has to be read before the page is loaded: a write that
+    lands in between then leaves a page newer than its key, never older.
+    A session that has changed a scope itself (see `invalidate`) bypasses
+    the cache for that scope until it commits or rolls back, because the
+    version it reads is not committed and could be taken by another write.
+
+    The cached lists hold plain rows (immutable named tuples, see
+    BaseRepository.list_rows), never ORM objects, so they can be shared
+    between sessions and threads as they are.
+    """
+    def __init__(self, backend: CacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, scope: Hashable, version: Hashable, params: tuple,
+                    load: Callable[[], list], session: Session | None = None) -> list:
+        """
+        Returns the cached list for (scope, version, params), or calls `load`
+        and caches its result. `version` must have been read before `load`
+        runs, in `session` if one is given.
+        """
+        if not self.enabled or self._changed_in(session, scope):
+            return load()
+        key = (scope, version, *params)
+        items = self.backend.get(key)
+        if items is not MISSING:
+            self._record(hit=True)
+            return list(items)
+        self._record(hit=False)
+        items = load()
+        self.backend.set(key, tuple(items))
+        return items
+
+    def invalidate(self, scope: Hashable, session: Session) -> None:
+        """
+        Records that `session` has changed `scope`. Other sessions need no
+        notice, the change moves the scope's version on when it commits; the
+        session itself reads around the cache until it ends.
+        """
+        session.info.setdefault(_PENDING_KEY, set()).add((self, scope))
+
+    def clear(self) -> None:
+        """Drops everything, e.g. between tests."""
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+        }
+
+    def _changed_in(self, session: Session | None, scope: Hashable) -> bool:
+        return session is not None and (self, scope) in session.info.get(_PENDING_KEY, ())
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+def _forget_changes(session: Session, transaction) -> None:
+    # Only the end of the outermost transaction; a savepoint ending changes nothing.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+event.listen(Session, "after_transaction_end", _forget_changes)
+
+# The cache shared by the services of this process.
+listing_cache = ListingCache(
+    LRUTTLCache(max_entries=LISTING_CACHE_MAX_ENTRIES, ttl=LISTING_CACHE_TTL_SECONDS),
+    enabled=LISTING_CACHE_ENABLED,
+)
@@ -1,63 +1,186 @@
-# (Imports and other functions in this file remain the same)
+import asyncio
+import contextlib
+import os
 import threading
-import time
-import schedule
 import datetime
-from db.session import get_db_session
+import time
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from db.session import async_session_scope, session_scope
 from repositories.project_repository import ProjectRepository
 from repositories.task_repository import TaskRepository
+from repositories.lease_repository import LeaseRepository
 from services.task_service import TaskService
+from services.lease_service import LeaseService
+from commands.scheduler import deadline_scheduler
+from monitoring.metrics import SCHEDULER_TASKS_CLOSED, SCHEDULER_TICK_DURATION, SCHEDULER_TICK_ERRORS
+
+load_dotenv()
+# Delay before a failed tick (lease, sweep or deadline seeding) is retried;
+# it doubles with every further failure, up to SCHEDULER_MAX_RETRY_SECONDS.
+SCHEDULER_RETRY_SECONDS = float(os.getenv("SCHEDULER_RETRY_SECONDS", 5))
+SCHEDULER_MAX_RETRY_SECONDS = float(os.getenv("SCHEDULER_MAX_RETRY_SECONDS", 300))
 
 _shutdown_event = threading.Event()
 
-def _overdue_check_job():
-    """The self-contained job to check for overdue tasks."""
-    # This function is correct and does not need to change.
+# Only the process holding this lease runs the sweep.
+OVERDUE_LEASE_NAME = "overdue-sweep"
+
+# --- Units of work ---
+# Each one takes a synchronous Session, so the thread loop runs them inside
+# session_scope() and the asyncio loop runs them through AsyncSession.run_sync.
+
+def _acquire_overdue_lease(db: Session) -> bool:
+    """
+    Takes (or renews) the overdue lease. It runs in its own short transaction,
+    so the other workers never wait on the leader's sweep. When the lease is
+    taken, the loop is told to retry once it expires.
+    """
+    lease_service = LeaseService(LeaseRepository(db))
+    if lease_service.acquire(OVERDUE_LEASE_NAME):
+        return True
+    deadline_scheduler.retry_after(lease_service.seconds_left(OVERDUE_LEASE_NAME))
+    return False
+
+def _release_overdue_lease(db: Session):
+    """Hands the lease over on shutdown instead of letting it expire."""
+    LeaseService(LeaseRepository(db)).release(OVERDUE_LEASE_NAME)
+
+def _close_overdue_tasks(db: Session) -> list[int]:
+    """Runs the overdue sweep on the given session and returns the closed task ids."""
     print("\n[Scheduler]: Running background check for overdue tasks...")
-    with get_db_session() as db:
-        try:
-            task_repo = TaskRepository(db)
-            project_repo = ProjectRepository(db)
-            task_service = TaskService(task_repo, project_repo)
-            
-            closed_tasks = task_service.close_all_overdue_tasks()
-            
-            if closed_tasks:
-                print(f"[Scheduler]: ✅ Closed {len(closed_tasks)} overdue task(s). (Type a command to refresh prompt)")
-            else:
-                print("[Scheduler]: No overdue tasks found. (Type a command to refresh prompt)")
-        except Exception as e:
-            print(f"\n[Scheduler]: ❌ Error during background check: {e}")
+    task_repo = TaskRepository(db)
+    project_repo = ProjectRepository(db)
+    task_service = TaskService(task_repo, project_repo)
+    return task_service.close_all_overdue_tasks()
+
+# The sweep metrics are recorded by the callers, around the session scope,
+# so they include the commit and a failed commit counts as a failed sweep.
+
+def _sweep_done(started: float, closed_tasks: list[int]):
+    SCHEDULER_TICK_DURATION.observe(time.perf_counter() - started)
+    SCHEDULER_TASKS_CLOSED.observe(len(closed_tasks))
+    if closed_tasks:
+        print(f"[Scheduler]: ✅ Closed {len(closed_tasks)} overdue task(s). (Type a command to refresh prompt)")
+    else:
+        print("[Scheduler]: No overdue tasks found. (Type a command to refresh prompt)")
+
+def _sweep_failed(e: Exception):
+    SCHEDULER_TICK_ERRORS.inc()
+    print(f"\n[Scheduler]: ❌ Error during background check: {e}")
+
+def _seed_deadlines(db: Session):
+    """Loads the deadlines of all open tasks into the in-memory heap, once."""
+    deadline_scheduler.seed(TaskRepository(db).list_open_deadlines())
+
+def _seed_done():
+    print(f"[Scheduler]: Initial check complete. Tracking {len(deadline_scheduler)} deadline(s).")
+
+def _seed_failed(e: Exception):
+    print(f"[Scheduler]: Could not load upcoming deadlines. Error: {e}")
+
+def _print_next_deadline():
+    next_run_time = deadline_scheduler.next_due()
+    if next_run_time:
+        print(f"[Scheduler]: Next check at {next_run_time.strftime('%Y-%m-%d %H:%M:%S')}.")
+    else:
+        print("[Scheduler]: No upcoming deadlines. Waiting for new tasks.")
+
+def _lease_error(e: Exception):
+    print(f"\n[Scheduler]: ❌ Could not acquire the overdue lease: {e}")
+
+def _retry_delay(failures: int) -> float:
+    return min(SCHEDULER_RETRY_SECONDS * 2 ** (failures - 1), SCHEDULER_MAX_RETRY_SECONDS)
+
+def _tick_done(succeeded: bool, now: datetime.datetime, failures: int) -> int:
+    """
+    Ends a tick of either loop and returns the new count of consecutive
+    failures. Only a tick that succeeded drops the deadlines it covered;
+    after a failure they stay in the heap and the tick is retried with
+    backoff.
+    """
+    if succeeded:
+        failures = 0
+        deadline_scheduler.pop_due(now)
+    else:
+        failures += 1
+        delay = _retry_delay(failures)
+        print(f"[Scheduler]: Retrying in {delay:g} second(s).")
+        deadline_scheduler.retry_after(delay)
+    _print_next_deadline()
+    return failures
+
+# --- Thread loop (CLI) ---
+
+def _overdue_check_job() -> bool:
+    """
+    The self-contained job to check for overdue tasks. Returns False if it
+    failed and has to be retried; skipping because another process holds
+    the lease is not a failure.
+    """
+    try:
+        with session_scope() as db:
+            is_leader = _acquire_overdue_lease(db)
+    except Exception as e:
+        _lease_error(e)
+        return False
+    if not is_leader:
+        print("[Scheduler]: Another process is running the overdue check. Skipping.")
+        return True
+
+    started = time.perf_counter()
+    try:
+        with session_scope() as db:
+            closed_tasks = _close_overdue_tasks(db)
+    except Exception as e:
+        _sweep_failed(e)
+        return False
+    _sweep_done(started, closed_tasks)
+    return True
+
+def _seed_job() -> bool:
+    try:
+        with session_scope() as db:
+            _seed_deadlines(db)
+    except Exception as e:
+        _seed_failed(e)
+        return False
+    _seed_done()
+    return True
 
 def _run_scheduler_loop():
     """
-    This function runs in a separate thread. It executes pending jobs
-    in a loop until the دshutdown event is set.
+    This function runs in a separate thread. Instead of polling, it sleeps
+    until the earliest known deadline passes (or the heap changes) and only
+    then runs the overdue check, until the shutdown event is set. Deadlines
+    are seeded after the first check, and again on every tick until that
+    succeeds.
     این عملا لوپی هست که ترد ما تمام اسکریپت های رانش رو اینجا قرار میدیم
     """
-    # --- Configure the schedule ---
-    schedule.every().minute.do(_overdue_check_job)
-    
     print("[Scheduler]: Performing initial startup check for overdue tasks...")
-    _overdue_check_job()
-    
+    seeded = False
+    failures = 0
+    # Everything due up to this moment is covered by the sweep below.
+    now = datetime.datetime.now()
+    while True:
+        succeeded = _overdue_check_job()
+        if succeeded and not seeded:
+            succeeded = seeded = _seed_job()
+        failures = _tick_done(succeeded, now, failures)
+        if not deadline_scheduler.wait_until_due(_shutdown_event):
+            break
+        now = datetime.datetime.now()
+
     try:
-        if schedule.jobs:
-            next_run_time = schedule.jobs[0].next_run
-            print(f"[Scheduler]: Initial check complete. Next check at {next_run_time.strftime('%Y-%m-%d %H:%M:%S')}.")
-        else:
-            print("[Scheduler]: Initial check complete. No further jobs are scheduled.")
+        with session_scope() as db:
+            _release_overdue_lease(db)
     except Exception as e:
-        print(f"[Scheduler]: Could not determine next run time. Error: {e}")
-
-    while not _shutdown_event.is_set():
-        schedule.run_pending()
-        time.sleep(60)
-    
+        print(f"[Scheduler]: Could not release the overdue lease. Error: {e}")
     print("\n[Scheduler]: Background scheduler has been shut down.")
 
 def start_background_scheduler():
     """Starts the scheduler loop in a new background daemon thread."""
+    _shutdown_event.clear()
     scheduler_thread = threading.Thread(target=_run_scheduler_loop, daemon=True)
     scheduler_thread.start()
     print("[Scheduler]: Background thread for checking tasks has started.")
@@ -67,3 +190,75 @@ def stop_background_scheduler():
     """Signals the background scheduler thread to shut down."""
     print("\n[Scheduler]: Signaling background thread to shut down...")
     _shutdown_event.set()
+    # Interrupt the wait right away instead of letting it run until the next deadline.
+    deadline_scheduler.wake()
+
+# --- Asyncio loop (API) ---
+
+async def _overdue_check_job_async() -> bool:
+    """_overdue_check_job on the async engine, without leaving the event loop."""
+    try:
+        async with async_session_scope() as db:
+            is_leader = await db.run_sync(_acquire_overdue_lease)
+    except Exception as e:
+        _lease_error(e)
+        return False
+    if not is_leader:
+        print("[Scheduler]: Another process is running the overdue check. Skipping.")
+        return True
+
+    started = time.perf_counter()
+    try:
+        async with async_session_scope() as db:
+            closed_tasks = await db.run_sync(_close_overdue_tasks)
+    except Exception as e:
+        _sweep_failed(e)
+        return False
+    _sweep_done(started, closed_tasks)
+    return True
+
+async def _seed_job_async() -> bool:
+    try:
+        async with async_session_scope() as db:
+            await db.run_sync(_seed_deadlines)
+    except Exception as e:
+        _seed_failed(e)
+        return False
+    _seed_done()
+    return True
+
+async def _run_scheduler_async():
+    """
+    The same loop as _run_scheduler_loop, but as a coroutine so it can live
+    inside the API's event loop. Waiting for deadlines costs no thread at all.
+    """
+    print("[Scheduler]: Performing initial startup check for overdue tasks...")
+    seeded = False
+    failures = 0
+    try:
+        now = datetime.datetime.now()
+        while True:
+            succeeded = await _overdue_check_job_async()
+            if succeeded and not seeded:
+                succeeded = seeded = await _seed_job_async()
+            failures = _tick_done(succeeded, now, failures)
+            await deadline_scheduler.wait_until_due_async()
+            now = datetime.datetime.now()
+    finally:
+        try:
+            async with async_session_scope() as db:
+                await db.run_sync(_release_overdue_lease)
+        except Exception as e:
+            print(f"[Scheduler]: Could not release the overdue lease. Error: {e}")
+        print("[Scheduler]: Async scheduler has been shut down.")
+
+def start_async_scheduler() -> asyncio.Task:
+    """Starts the scheduler loop as a task on the running event loop."""
+    print("[Scheduler]: Async task for checking tasks has started.")
+    return asyncio.create_task(_run_scheduler_async(), name="overdue-scheduler")
+
+async def stop_async_scheduler(scheduler_task: asyncio.Task):
+    """Cancels the scheduler task and waits until it has finished."""
+    scheduler_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await scheduler_task
@@ -0,0 +1,230 @@
+"""
+Bulk import of projects and tasks from the files written by the export
+(NDJSON: one project with its tasks per line; CSV: one task per line).
+
+The input is read as a stream and imported in chunks of about
+IMPORT_CHUNK_SIZE tasks, each in its own transaction, so memory depends on
+the chunk size and not on the file size. Every record goes through the
+usual service rules. When a chunk fails, the import stops and reports the
+record to resume from; earlier chunks stay committed.
+
+Tasks keep their exported created_at and closed_at. Ids are not kept:
+projects are matched by name and tasks get new ids.
+"""
+import csv
+import datetime
+import json
+import os
+import time
+from itertools import groupby, islice
+from typing import Iterable, Iterator
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+from db.session import session_scope
+from repositories.project_repository import ProjectRepository
+from repositories.task_repository import TaskRepository
+from services.project_service import ProjectService
+from services.task_service import TaskService
+from exceptions.service_exceptions import ProjectServiceError, TaskServiceError
+from commands.scheduler import deadline_scheduler
+
+load_dotenv()
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+IMPORT_FORMATS = ("ndjson", "csv")
+# Rejected records listed in the report; the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+# --- Reading ---
+# A record is one project with the tasks to import into it.
+
+# Fields of an NDJSON record that must be strings when present (null counts as missing).
+PROJECT_TEXT_FIELDS = ("name", "description")
+TASK_TEXT_FIELDS = ("title", "description", "status", "deadline", "created_at", "closed_at")
+
+def _check_text(item: dict, fields: tuple, kind: str):
+    """Raises ValueError if one of `fields` of `item` is present but not a string."""
+    for field in fields:
+        value = item.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{kind} field '{field}' must be a string, not {type(value).__name__}.")
+
+def _timestamp(item: dict, field: str) -> datetime.datetime | None:
+    """An exported ISO 8601 timestamp as a naive UTC datetime, like the ones stored."""
+    value = item.get(field) or None
+    if value is None:
+        return None
+    try:
+        value = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Task field '{field}' must be an ISO 8601 timestamp.")
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+def _task_data(item: dict) -> dict:
+    """
+    The import_tasks data of an exported task. Raises ValueError for a field
+    of the wrong type or a malformed timestamp.
+    """
+    _check_text(item, TASK_TEXT_FIELDS, "Task")
+    deadline = item.get("deadline") or None
+    # Exports carry full timestamps; deadlines are whole days.
+    if deadline and len(deadline) > 10 and deadline[10] in "T ":
+        deadline = deadline[:10]
+    return {
+        "title": item.get("title"),
+        "description": item.get("description") or None,
+        "deadline": deadline,
+        "status": item.get("status") or "todo",
+        "created_at": _timestamp(item, "created_at"),
+        "closed_at": _timestamp(item, "closed_at"),
+    }
+
+def _is_project_object(project) -> bool:
+    """Whether a parsed NDJSON line is an object whose tasks (if any) are a list of objects."""
+    if not isinstance(project, dict):
+        return False
+    tasks = project.get("tasks") or []
+    return isinstance(tasks, list) and all(isinstance(task, dict) for task in tasks)
+
+def _project_record(project) -> dict:
+    """The record of a parsed NDJSON line. Raises ValueError if it has the wrong shape or types."""
+    if not _is_project_object(project):
+        raise ValueError("A record must be a project object with a list of task objects.")
+    _check_text(project, PROJECT_TEXT_FIELDS, "Project")
+    return {
+        "name": project.get("name"),
+        "description": project.get("description"),
+        "tasks": [_task_data(task) for task in project.get("tasks") or []],
+    }
+
+def _read_ndjson(lines: Iterable[str]) -> Iterator[dict]:
+    for line in lines:
+        if line.strip():
+            project = json.loads(line)
+            try:
+                record = _project_record(project)
+            except ValueError as e:
+                # Valid JSON of the wrong shape: rejected as a record, not fatal.
+                record = {"name": None, "description": None, "tasks": [], "error": str(e)}
+            yield record
+
+def _read_csv(lines: Iterable[str]) -> Iterator[dict]:
+    # Consecutive lines of the same project form one record.
+    rows = csv.DictReader(lines)
+    for name, project_rows in groupby(rows, key=lambda row: row.get("project_name")):
+        first = next(project_rows)
+        try:
+            tasks = [_task_data(row) for row in (first, *project_rows) if row.get("title")]
+        except ValueError as e:
+            yield {"name": None, "description": None, "tasks": [], "error": str(e)}
+            continue
+        yield {
+            "name": name,
+            "description": first.get("project_description") or None,
+            "tasks": tasks,
+        }
+
+def _chunks(records: Iterator[dict], chunk_size: int) -> Iterator[list[dict]]:
+    """Groups records into chunks of at least `chunk_size` tasks (the last may be smaller)."""
+    chunk, size = [], 0
+    for record in records:
+        chunk.append(record)
+        size += max(1, len(record["tasks"]))
+        if size >= chunk_size:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+# --- Unit of work ---
+
+def _import_chunk(db: Session, records: list[dict], first_record: int, report: dict):
+    """Imports one chunk of records on the given session and updates the report."""
+    project_repo = ProjectRepository(db)
+    project_service = ProjectService(project_repo)
+    task_service = TaskService(TaskRepository(db), project_repo)
+
+    def reject(offset: int, error: Exception):
+        report["rejected"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"record": first_record + offset, "error": str(error)})
+
+    # Projects are matched by name, so running an import twice does not
+    # duplicate them; new ones are created with the usual rules.
+    project_ids = project_repo.ids_by_name({record["name"] for record in records if record["name"]})
+    items, owners = [], []
+    for offset, record in enumerate(records):
+        if record.get("error"):
+            reject(offset, ValueError(record["error"]))
+            continue
+        name = record["name"]
+        if name not in project_ids:
+            data = {"name": name}
+            if record["description"] is not None:
+                data["description"] = record["description"]
+            try:
+                project_ids[name] = project_service.create_project(data).id
+                report["projects_created"] += 1
+            except (ProjectServiceError, TaskServiceError) as e:
+                # Name and description rules raise the shared title/description errors.
+                reject(offset, e)
+                continue
+        for task in record["tasks"]:
+            items.append({**task, "project_id": project_ids[name]})
+            owners.append(offset)
+
+    for offset, error in zip(owners, task_service.import_tasks(items)):
+        if error is None:
+            report["tasks_created"] += 1
+        else:
+            reject(offset, error)
+
+def _seed_deadlines():
+    """Reloads the deadline heap, which import_tasks does not maintain."""
+    with session_scope() as db:
+        deadline_scheduler.seed(TaskRepository(db).list_open_deadlines())
+
+def run_import(lines: Iterable[str], fmt: str, resume_from: int = 0,
+               chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """
+    Imports the records read from `lines` (text lines in `fmt`), skipping the
+    first `resume_from` records.
+
+    :return: A report with the counts, the throughput and, when a chunk
+        failed, the error and the record to pass as `resume_from` next time.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format '{fmt}'. Must be one of: {IMPORT_FORMATS}")
+    records = _read_ndjson(lines) if fmt == "ndjson" else _read_csv(lines)
+
+    report = {
+        "records": 0, "projects_created": 0, "tasks_created": 0, "rejected": 0,
+        "errors": [], "seconds": 0.0, "tasks_per_second": 0.0,
+        "failed": False, "error": None, "resume_from": None,
+    }
+    started = time.perf_counter()
+    position = resume_from
+    try:
+        for chunk in _chunks(islice(records, resume_from, None), chunk_size):
+            checkpoint = dict(report, errors=list(report["errors"]))
+            try:
+                with session_scope() as db:
+                    _import_chunk(db, chunk, position, report)
+            except Exception as e:
+                # The chunk was rolled back; undo its counts and stop here.
+                report.update(checkpoint, failed=True, error=str(e), resume_from=position)
+                break
+            position += len(chunk)
+            report["records"] = position - resume_from
+    except (ValueError, KeyError, csv.Error) as e:
+        # Unreadable input: everything before the current chunk is imported.
+        report.update(failed=True, error=f"Invalid {fmt} input: {e}", resume_from=position)
+    finally:
+        if report["tasks_created"]:
+            _seed_deadlines()
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    if report["seconds"]:
+        report["tasks_per_second"] = round(report["tasks_created"] / report["seconds"], 1)
+    return report
@@ -0,0 +1,188 @@
+import asyncio
+import datetime
+import heapq
+import threading
+from typing import Callable, Iterable, Optional, Union
+
+DeadlineValue = Union[datetime.datetime, datetime.date, str, None]
+
+
+class DeadlineScheduler:
+    """
+    An in-memory min-heap of upcoming task deadlines.
+
+    It is seeded once from the database and then kept up to date by the
+    TaskService (create/edit/delete), so the background loop can sleep until
+    the next deadline instead of polling the tasks table.
+
+    Entries are never removed from the middle of the heap. Instead the latest
+    due time of every task lives in `_due_at`, and heap entries that no longer
+    match it are dropped lazily when they reach the top.
+    """
+    def __init__(self):
+        self._heap: list[tuple[datetime.datetime, int]] = []
+        self._due_at: dict[int, datetime.datetime] = {}
+        self._changed = threading.Condition()
+        self._listeners: list[Callable[[], None]] = []
+        self._retry_at: Optional[datetime.datetime] = None
+
+    @staticmethod
+    def due_time(deadline: DeadlineValue) -> Optional[datetime.datetime]:
+        """
+        Returns the moment a deadline becomes overdue: midnight after the
+        deadline's date (deadlines are stored with day precision).
+        """
+        if deadline is None or deadline == "":
+            return None
+        if isinstance(deadline, str):
+            deadline = datetime.datetime.strptime(deadline, "%Y-%m-%d")
+        if isinstance(deadline, datetime.datetime):
+            deadline = deadline.date()
+        return datetime.datetime.combine(deadline + datetime.timedelta(days=1), datetime.time.min)
+
+    def seed(self, rows: Iterable[tuple[int, DeadlineValue]]) -> None:
+        """Replaces the heap content with the given (task_id, deadline) pairs."""
+        with self._changed:
+            self._due_at = {}
+            for task_id, deadline in rows:
+                due = self.due_time(deadline)
+                if due is not None:
+                    self._due_at[task_id] = due
+            self._heap = [(due, task_id) for task_id, due in self._due_at.items()]
+            heapq.heapify(self._heap)
+            self._notify()
+
+    def schedule(self, task_id: int, deadline: DeadlineValue) -> None:
+        """Adds or moves the deadline of a task. A missing deadline removes it."""
+        due = self.due_time(deadline)
+        if due is None:
+            self.discard(task_id)
+            return
+        with self._changed:
+            if self._due_at.get(task_id) == due:
+                return
+            self._due_at[task_id] = due
+            heapq.heappush(self._heap, (due, task_id))
+            # Only the loop's wake-up time can change, so only wake it when
+            # the new entry is the earliest one.
+            if self._heap[0] == (due, task_id):
+                self._notify()
+
+    def discard(self, task_id: int) -> None:
+        """Forgets a task (deleted, closed or without deadline)."""
+        with self._changed:
+            self._due_at.pop(task_id, None)
+
+    def retry_after(self, seconds: float) -> None:
+        """
+        Asks the loop to wake up again after `seconds`: not later, even if no
+        deadline is due by then, and not earlier, even if one is (it is still
+        in the heap if the tick failed). Used when a tick had to be skipped or
+        failed. The latest call wins.
+        """
+        when = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
+        with self._changed:
+            self._retry_at = when
+            self._notify()
+
+    def next_due(self) -> Optional[datetime.datetime]:
+        """Returns the earliest pending wake-up time, or None if nothing is scheduled."""
+        with self._changed:
+            return self._next_wake_up()
+
+    def pop_due(self, now: datetime.datetime) -> list[int]:
+        """Removes and returns every task that became overdue at or before `now`."""
+        popped = []
+        with self._changed:
+            if self._retry_at is not None and self._retry_at <= now:
+                self._retry_at = None
+            while self._peek() is not None and self._heap[0][0] <= now:
+                _, task_id = heapq.heappop(self._heap)
+                del self._due_at[task_id]
+                popped.append(task_id)
+        return popped
+
+    def wait_until_due(self, shutdown_event: threading.Event) -> bool:
+        """
+        Blocks until the earliest deadline has passed.
+
+        Returns True when there is due work and False as soon as the shutdown
+        event is set (see `wake`).
+        """
+        with self._changed:
+            while not shutdown_event.is_set():
+                due = self._next_wake_up()
+                now = datetime.datetime.now()
+                if due is not None and due <= now:
+                    return True
+                timeout = None if due is None else (due - now).total_seconds()
+                if timeout is not None:
+                    timeout = min(timeout, threading.TIMEOUT_MAX)
+                self._changed.wait(timeout)
+            return False
+
+    async def wait_until_due_async(self) -> None:
+        """
+        Asyncio counterpart of `wait_until_due`: returns once the earliest
+        deadline has passed. Stop it by cancelling the awaiting task.
+
+        The heap is changed from request threads, so changes reach the event
+        loop through `call_soon_threadsafe`.
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def listener():
+            loop.call_soon_threadsafe(changed.set)
+
+        with self._changed:
+            self._listeners.append(listener)
+        try:
+            while True:
+                changed.clear()
+                due = self.next_due()
+                now = datetime.datetime.now()
+                if due is not None and due <= now:
+                    return
+                timeout = None if due is None else (due - now).total_seconds()
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._changed:
+                self._listeners.remove(listener)
+
+    def wake(self) -> None:
+        """Wakes up anything waiting in `wait_until_due` or `wait_until_due_async`."""
+        with self._changed:
+            self._notify()
+
+    def __len__(self) -> int:
+        with self._changed:
+            return len(self._due_at)
+
+    def _notify(self) -> None:
+        # Must be called with the lock held.
+        self._changed.notify_all()
+        for listener in self._listeners:
+            listener()
+
+    def _next_wake_up(self) -> Optional[datetime.datetime]:
+        # Must be called with the lock held.
+        if self._retry_at is not None:
+            return self._retry_at
+        return self._peek()
+
+    def _peek(self) -> Optional[datetime.datetime]:
+        # Must be called with the lock held. Drops stale heads on the way.
+        while self._heap:
+            due, task_id = self._heap[0]
+            if self._due_at.get(task_id) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+
+# The single scheduler shared by the services and the background loop.
+deadline_scheduler = DeadlineScheduler()
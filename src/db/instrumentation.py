@@ -0,0 +1,101 @@
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+# Statements slower than this are printed with their duration; 0 turns the log off.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+# Adds the X-DB-* headers (query count, DB time, slowest statement) to every response.
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", "false").lower() == "true"
+# Warns when one statement shape runs more than this many times in a request; 0 turns it off.
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 0))
+
+# Bound parameters of the drivers we use (?, %(name)s, $1) and lists of them.
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|\$\d+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+# Per-connection stack of statement start times (executions can nest).
+_START_TIMES_KEY = "query_start_times"
+
+
+class QueryStats:
+    """The statements one request (or any other unit of work) ran."""
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: str | None = None
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if N_PLUS_ONE_THRESHOLD:
+            self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """The statement shapes that ran more than `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+# The stats of the request being served, if it is tracked. The async
+# driver runs statements in greenlets that inherit the request's context,
+# and run_in_threadpool copies it, so every statement of a request lands here.
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace collapsed and every parameter (list) replaced by one '?'."""
+    shape = _PLACEHOLDER.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _PLACEHOLDER_LIST.sub("?", shape)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collects the statements run inside the block (in this context) into a QueryStats."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info[_START_TIMES_KEY].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if SLOW_QUERY_THRESHOLD_MS and seconds * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        print(f"[SQL]: Slow query ({seconds * 1000:.1f} ms): {_WHITESPACE.sub(' ', statement)}")
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute.
+    if context.connection is not None and context.connection.info.get(_START_TIMES_KEY):
+        context.connection.info[_START_TIMES_KEY].pop()
+
+
+def instrument_engine(engine) -> None:
+    """
+    Times every statement the engine runs: feeds the QueryStats of the
+    current request and the slow-query log. For an AsyncEngine, pass its
+    sync_engine.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
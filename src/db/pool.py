@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy import exc, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+load_dotenv()
+
+# Connection pool settings. Size the pools so that
+# (pool size + overflow) * number of processes stays below max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Number of connections the API opens at startup, before the first request.
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 0))
+
+
+class PoolStats:
+    """Counters about how long callers waited to get a connection."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": round(self.total_wait_seconds, 6),
+                "avg_wait_seconds": round(self.total_wait_seconds / attempts, 6) if attempts else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+
+
+def _instrumented(pool_class: type[QueuePool], stats: PoolStats) -> type[QueuePool]:
+    """
+    Subclasses a queue pool so every checkout records how long it took to get
+    a connection (waiting for a free one and/or opening a new one).
+    The stats live in the class, so they survive pool.recreate() on dispose.
+    """
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def pool_options(database_url: str, stats: PoolStats, is_async: bool = False) -> dict:
+    """
+    Keyword arguments for create_engine/create_async_engine built from the
+    DB_POOL_* settings. In-memory SQLite keeps SQLAlchemy's default pool,
+    since every new connection there would be a new, empty database.
+    """
+    scheme, _, path = database_url.partition("://")
+    if scheme.startswith("sqlite") and path in ("", "/:memory:"):
+        return {}
+    pool_class = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": _instrumented(pool_class, stats),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine, stats: PoolStats) -> dict:
+    """A snapshot of the pool's gauges plus the checkout wait counters."""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": DB_MAX_OVERFLOW,
+        })
+    status.update(stats.as_dict())
+    return status
+
+
+def warm_up(engine, connections: int = DB_POOL_WARMUP) -> int:
+    """Opens `connections` connections up front and returns them to the pool."""
+    opened = [engine.connect() for _ in range(connections)]
+    for connection in opened:
+        connection.execute(text("SELECT 1"))
+        connection.close()
+    return len(opened)
+
+
+async def warm_up_async(async_engine, connections: int = DB_POOL_WARMUP) -> int:
+    """The async engine's version of warm_up."""
+    opened = [await async_engine.connect() for _ in range(connections)]
+    for connection in opened:
+        await connection.execute(text("SELECT 1"))
+        await connection.close()
+    return len(opened)
@@ -1,7 +1,12 @@
 import os
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from db.pool import PoolStats, pool_options, pool_status
+from db.instrumentation import instrument_engine
+from monitoring.metrics import DB_POOL_CHECKOUTS, DB_POOL_CONNECTIONS, DB_POOL_WAIT
 
 load_dotenv()
 
@@ -11,19 +16,103 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-required_vars = [DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]
-if not all(required_vars):
-    raise ValueError(
-        "One or more database environment variables are missing. "
-        "Please check your .env file for DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME."
-    )
+# A full DATABASE_URL (e.g. sqlite:///./todolist.db for local testing) takes
+# precedence over the individual PostgreSQL settings.
+DATABASE_URL = os.getenv("DATABASE_URL")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+if not DATABASE_URL:
+    required_vars = [DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]
+    if not all(required_vars):
+        raise ValueError(
+            "One or more database environment variables are missing. "
+            "Please check your .env file for DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME."
+        )
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# SQLite connections are shared between the request threads and the scheduler.
+connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL)
+# The API runs on an async driver (asyncpg, or aiosqlite locally) so a request
+# waiting on the database does not hold a worker thread. The CLI and the
+# scheduler thread keep using the synchronous engine.
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+if not ASYNC_DATABASE_URL:
+    scheme, _, rest = DATABASE_URL.partition("://")
+    ASYNC_DATABASE_URL = f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+# Wait-time counters for each engine's pool, see db.pool and pool_metrics().
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=connect_args,
+    **pool_options(DATABASE_URL, sync_pool_stats),
+)
 SessionFactory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **pool_options(ASYNC_DATABASE_URL, async_pool_stats, is_async=True),
+)
+# Per-request query counts and timings, and the slow-query log.
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked to.
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    event.listen(async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+# Objects are read after the commit (response serialization), and an async
+# session cannot lazily reload expired attributes, so nothing expires on commit.
+AsyncSessionFactory = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+def pool_metrics() -> dict:
+    """Pool gauges and checkout wait times of both engines."""
+    return {
+        "sync": pool_status(engine, sync_pool_stats),
+        "async": pool_status(async_engine.sync_engine, async_pool_stats),
+    }
+
+
+# The /metrics pool series are read from pool_metrics() at scrape time.
+POOL_GAUGE_STATES = ("size", "checked_out", "checked_in", "overflow")
+
+
+def _pool_connections() -> dict:
+    return {
+        (name, state): status[state]
+        for name, status in pool_metrics().items()
+        for state in POOL_GAUGE_STATES if state in status
+    }
+
+
+def _pool_checkouts() -> dict:
+    series = {}
+    for name, status in pool_metrics().items():
+        series[(name, "ok")] = status["checkouts"]
+        series[(name, "timeout")] = status["timeouts"]
+    return series
+
+
+def _pool_wait() -> dict:
+    return {(name,): status["total_wait_seconds"] for name, status in pool_metrics().items()}
+
+
+DB_POOL_CONNECTIONS.set_function(_pool_connections)
+DB_POOL_CHECKOUTS.set_function(_pool_checkouts)
+DB_POOL_WAIT.set_function(_pool_wait)
+
 
 def get_db_session():
     """
@@ -38,4 +127,42 @@ def get_db_session():
         db.rollback() # Roll back the transaction in case of any error
         raise
     finally:
-        db.close() # Always close the session
\ No newline at end of file
+        db.close() # Always close the session
+
+
+@contextmanager
+def session_scope():
+    """
+    The same transactional session as get_db_session, usable in a `with`
+    block by code that does not run through FastAPI (CLI, scheduler).
+    """
+    yield from get_db_session()
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """
+    The async counterpart of session_scope: commits on success, rolls back on
+    error and always closes the AsyncSession.
+    """
+    db = AsyncSessionFactory()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def get_async_db_session():
+    """
+    FastAPI dependency providing a transactional AsyncSession.
+
+    Services and repositories are synchronous code; endpoints run them on this
+    session with `await db.run_sync(...)`, which drives the async driver from
+    the event loop without a thread.
+    """
+    async with async_session_scope() as db:
+        yield db
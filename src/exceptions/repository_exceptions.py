@@ -0,0 +1,8 @@
+class RepositoryError(Exception):
+    """Base exception for repository errors."""
+    pass
+
+
+class DuplicateEntryError(RepositoryError):
+    """Raised when a write violates a unique constraint."""
+    pass
@@ -55,4 +55,9 @@ class TitleTooLongError(TaskServiceError):
 
 class DescriptionTooLongError(TaskServiceError):
     """Raised when a description exceeds the maximum length."""
-    pass
\ No newline at end of file
+    pass
+
+
+class EmptySearchQueryError(TaskServiceError):
+    """Raised when a search query has nothing to search for."""
+    pass
@@ -7,4 +7,5 @@ from db.base import Base
 # When these lines are executed, each model class will register itself
 # with the SQLAlchemy metadata attached to the 'Base' object.
 from .project import Project
-from .task import Task
\ No newline at end of file
+from .task import Task
+from .scheduler_lease import SchedulerLease
@@ -5,11 +5,24 @@ from db.base import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    # Ids are never reused (PostgreSQL's sequence already guarantees it), so
+    # a project id plus its tasks_version, and the (count, highest id, sum of
+    # versions) of the list, always identify one state; see the list ETags.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
     description = Column(String, nullable=True)
+    # Number of tasks in the project, maintained by the repositories so the
+    # task limit can be enforced without counting the tasks.
+    task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Change counters behind the ETags of the list endpoints: `version` is
+    # bumped when the project is edited, `tasks_version` on any change to its tasks.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    tasks_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # This establishes the "one-to-many" relationship. It actually have casacde feature and use to build a connection
     # between project and Tasket 
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    # passive_deletes leaves deleting the tasks to the database (ON DELETE CASCADE
+    # on tasks.project_id), so deleting a project never loads its tasks.
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
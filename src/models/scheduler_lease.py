@@ -0,0 +1,14 @@
+import datetime
+from sqlalchemy import Column, String, DateTime
+
+from db.base import Base
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    # One row per named job (e.g. "overdue-sweep"). Whoever holds an unexpired
+    # row is the only process allowed to run that job.
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
@@ -1,6 +1,6 @@
 import enum
 import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import DDL, Column, Integer, String, DateTime, Enum, ForeignKey, Index, event, text
 from sqlalchemy.orm import relationship
 
 from db.base import Base
@@ -10,8 +10,27 @@ class TaskStatus(str, enum.Enum):
     DOING = "doing"
     DONE = "done"
 
+# The SQL for "not done yet". It is the predicate of the partial index
+# ix_tasks_open_deadline, and queries that want that index must use the same
+# literal (a bound parameter would hide the match from the planner).
+OPEN_TASK_PREDICATE = "status <> 'DONE'"
+
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Listing a project's tasks in id order (list_for_project, pagination).
+        Index("ix_tasks_project_id_id", "project_id", "id"),
+        # Range filters and keyset-paginated sorting in filter_tasks.
+        Index("ix_tasks_deadline_id", "deadline", "id"),
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        # The overdue sweep and the deadline heap only look at open tasks.
+        Index(
+            "ix_tasks_open_deadline",
+            "deadline",
+            postgresql_where=text(OPEN_TASK_PREDICATE),
+            sqlite_where=text(OPEN_TASK_PREDICATE),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -22,8 +41,43 @@ class Task(Base):
     closed_at = Column(DateTime, nullable=True)
 
     # This is the foreign key that creates the link to the 'projects' table.
-    project_id = Column(Integer, ForeignKey("projects.id"))
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
 
     # This establishes the other side of the relationship, linking a Task
     # back to its single Project object.
     project = relationship("Project", back_populates="tasks")
+
+
+# --- Full-text search over title and description ---
+# PostgreSQL: a GIN index on this expression. Search queries must use the very
+# same expression so the planner picks the index.
+SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, ''))"
+)
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+# The migration creates these too; the events cover Base.metadata.create_all().
+event.listen(
+    Task.__table__, "after_create",
+    DDL(f"CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING gin ({SEARCH_DOCUMENT_SQL})")
+    .execute_if(dialect="postgresql"),
+)
+for statement in SQLITE_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Task.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,196 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, TypeVar
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The content type of the text exposition format rendered by Registry.render.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metric(ABC):
+    """
+    A metric family in the Prometheus data model: a name, a help text and,
+    for each combination of label values, one or more samples.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        """(sample name, labels, value) for every sample of the family."""
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class _ValueMetric(Metric):
+    """One value per label combination, either stored or read from a function at scrape time."""
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        super().__init__(name, help, labelnames)
+        # A metric without labels is exported as 0 before its first update.
+        self._values: dict[tuple, float] = {} if self.labelnames else {(): 0}
+        self._function: Callable[[], dict[tuple, float]] | None = None
+
+    def set_function(self, function: Callable[[], dict[tuple, float]]) -> None:
+        """Reads the values from `function` (label values tuple -> value) on every scrape."""
+        self._function = function
+
+    def samples(self):
+        if self._function is not None:
+            values = self._function()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Counter(_ValueMetric):
+    """A value that only goes up."""
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_ValueMetric):
+    """A value that goes up and down."""
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """
+    Observations counted into cumulative buckets (`le` = less or equal),
+    with their sum and count, per label combination.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [count per bucket (not cumulative), sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in snapshot.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": "+Inf" if bound == math.inf else repr(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+M = TypeVar("M", bound=Metric)
+
+
+class Registry:
+    """The metrics of the process, rendered in the Prometheus text format."""
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: M) -> M:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# --- The metrics of the application ---
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Time to serve an API request, by method and route template.",
+    ("method", "route"),
+))
+HTTP_REQUEST_ERRORS = registry.register(Counter(
+    "http_request_errors_total",
+    "API responses with a 4xx/5xx status (unhandled exceptions count as 500).",
+    ("method", "route", "status"),
+))
+SCHEDULER_TICK_DURATION = registry.register(Histogram(
+    "scheduler_tick_duration_seconds",
+    "Time taken by one overdue sweep of the scheduler.",
+))
+SCHEDULER_TASKS_CLOSED = registry.register(Histogram(
+    "scheduler_tasks_closed_per_tick",
+    "Overdue tasks closed by one sweep of the scheduler.",
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+))
+SCHEDULER_TICK_ERRORS = registry.register(Counter(
+    "scheduler_tick_errors_total",
+    "Overdue sweeps that failed.",
+))
+# Filled in by db.session, which reads them from the pools at scrape time.
+DB_POOL_CONNECTIONS = registry.register(Gauge(
+    "db_pool_connections",
+    "Connections of the pool by state (size, checked_out, checked_in, overflow).",
+    ("engine", "state"),
+))
+DB_POOL_CHECKOUTS = registry.register(Counter(
+    "db_pool_checkouts_total",
+    "Connection checkouts, by outcome (ok or timeout).",
+    ("engine", "outcome"),
+))
+DB_POOL_WAIT = registry.register(Counter(
+    "db_pool_checkout_wait_seconds_total",
+    "Time spent waiting for a pooled connection.",
+    ("engine",),
+))
@@ -1,4 +1,5 @@
 from typing import Generic, Type, TypeVar
+from sqlalchemy import Row, insert
 from sqlalchemy.orm import Session
 from db.base import Base
 
@@ -30,13 +31,49 @@ class BaseRepository(Generic[ModelType]):
         self.db_session.refresh(db_item)
         return db_item
 
+    def add_many(self, rows: list[dict]) -> list[ModelType]:
+        """
+        Creates many records with a multi-row INSERT ... RETURNING, instead of
+        one add/flush/refresh round-trip per record. The rows should all have
+        the same keys. Returns the new instances in the order of `rows`.
+        """
+        if not rows:
+            return []
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        return list(self.db_session.scalars(stmt, rows))
+
+    def list_rows(self, after_id: int | None = None, limit: int | None = None) -> list[Row]:
+        """
+        Like `list`, but selects only `list_columns` and returns plain rows
+        (named tuples) instead of ORM objects: nothing is added to the
+        session and the rows can be serialized straight away.
+        """
+        query = self.db_session.query(*self.list_columns)
+        if after_id is not None:
+            query = query.filter(self.model.id > after_id)
+        return query.order_by(self.model.id).limit(limit).all()
+
+    @property
+    def list_columns(self) -> tuple:
+        """The columns selected by the row-returning list methods; all of them by default."""
+        return tuple(self.model.__table__.columns)
+
     def get(self, item_id: int) -> ModelType | None:
         """Fetches a single record by its primary key."""
         return self.db_session.query(self.model).filter(self.model.id == item_id).first()
 
-    def list(self) -> list[ModelType]:
-        """Fetches all records."""
-        return self.db_session.query(self.model).all()
+    def list(self, after_id: int | None = None, limit: int | None = None) -> list[ModelType]:
+        """
+        Fetches records ordered by primary key.
+
+        Pass `after_id` (the last id of the previous page) and `limit` for keyset
+        pagination: the id index is used to seek to the page, so a deep page
+        costs the same as the first one. Without them, all records are returned.
+        """
+        query = self.db_session.query(self.model)
+        if after_id is not None:
+            query = query.filter(self.model.id > after_id)
+        return query.order_by(self.model.id).limit(limit).all()
     
     def delete(self, item_id: int) -> ModelType | None:
         """Deletes a record by its primary key."""
@@ -0,0 +1,59 @@
+import datetime
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.scheduler_lease import SchedulerLease
+from repositories.base_repository import BaseRepository
+
+class LeaseRepository(BaseRepository[SchedulerLease]):
+    """
+    Repository for the scheduler leases used to elect a single job runner.
+    """
+    def __init__(self, db_session: Session):
+        super().__init__(model=SchedulerLease, db_session=db_session)
+
+    def try_acquire(self, name: str, holder: str, now: datetime.datetime,
+                    ttl: datetime.timedelta) -> bool:
+        """
+        Takes or renews the lease `name` for `holder` until `now + ttl`.
+
+        The lease is granted when it is free, expired or already ours. The
+        check and the write are one conditional UPDATE, so two processes can
+        never both win.
+        """
+        stmt = (
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == name,
+                (SchedulerLease.holder == holder) | (SchedulerLease.expires_at < now),
+            )
+            .values(holder=holder, expires_at=now + ttl, heartbeat_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if self.db_session.execute(stmt).rowcount == 1:
+            return True
+        if self.get_by_name(name) is not None:
+            return False
+
+        # First run ever: create the row. A concurrent insert makes us lose.
+        try:
+            with self.db_session.begin_nested():
+                self.db_session.add(SchedulerLease(
+                    name=name, holder=holder, expires_at=now + ttl, heartbeat_at=now
+                ))
+        except IntegrityError:
+            return False
+        return True
+
+    def release(self, name: str, holder: str, now: datetime.datetime) -> None:
+        """Expires the lease right away if `holder` still owns it."""
+        self.db_session.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+            .values(expires_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_by_name(self, name: str) -> SchedulerLease | None:
+        """Fetches a lease row by its name."""
+        return self.db_session.get(SchedulerLease, name, populate_existing=True)
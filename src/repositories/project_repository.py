@@ -1,6 +1,14 @@
+from typing import Iterator
+from sqlalchemy import Row, case, exists, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from models.project import Project
+from models.task import Task
 from repositories.base_repository import BaseRepository
+from exceptions.repository_exceptions import DuplicateEntryError
+
+# Key of the PostgreSQL advisory lock that serializes project creation.
+PROJECT_CREATE_LOCK_KEY = 0x70726F6A
 
 class ProjectRepository(BaseRepository[Project]):
     """
@@ -9,4 +17,204 @@ class ProjectRepository(BaseRepository[Project]):
     def __init__(self, db_session: Session):
         # This initializes the BaseRepository with the Project model
         # and the database session, giving it all the basic CRUD methods.
-        super().__init__(model=Project, db_session=db_session)
\ No newline at end of file
+        super().__init__(model=Project, db_session=db_session)
+
+    # What the project list shows; the counters are internal.
+    list_columns = (Project.id, Project.name, Project.description)
+
+    def add(self, data: dict) -> Project:
+        """
+        Inserts a project. The unique index on the name is the final judge of
+        duplicates, so a concurrent insert of the same name raises
+        DuplicateEntryError instead of creating a second row.
+        """
+        try:
+            with self.db_session.begin_nested():
+                return super().add(data)
+        except IntegrityError as e:
+            raise DuplicateEntryError(str(e.orig)) from e
+
+    def add_within_limit(self, data: dict, max_projects: int) -> Project | None:
+        """
+        Inserts a project unless there are already `max_projects`, with one
+        INSERT ... SELECT ... WHERE (SELECT count(*) FROM projects) < :max.
+        Returns None when the limit is reached; a duplicate name raises
+        DuplicateEntryError, like `add`.
+
+        On PostgreSQL the statement runs under a transaction-level advisory
+        lock, so concurrent creates are serialized and each one counts the
+        projects committed by the previous ones: under READ COMMITTED the
+        statement alone could let two of them see the same count. SQLite
+        already allows one writer at a time.
+        """
+        if self.db_session.get_bind().dialect.name == "postgresql":
+            self.db_session.execute(select(func.pg_advisory_xact_lock(PROJECT_CREATE_LOCK_KEY)))
+        columns = Project.__table__.c
+        below_limit = select(func.count()).select_from(Project).scalar_subquery() < max_projects
+        stmt = (
+            insert(Project)
+            .from_select(
+                list(data),
+                select(*(literal(value, columns[field].type) for field, value in data.items()))
+                .where(below_limit),
+            )
+            .returning(Project)
+        )
+        try:
+            with self.db_session.begin_nested():
+                return self.db_session.scalars(stmt).one_or_none()
+        except IntegrityError as e:
+            raise DuplicateEntryError(str(e.orig)) from e
+
+    def update(self, project: Project, changes: dict) -> Project:
+        """
+        Applies `changes` to a project and flushes them right away, so a name
+        clash surfaces here as DuplicateEntryError rather than at commit time.
+        The project's version is bumped in the same UPDATE.
+        """
+        try:
+            with self.db_session.begin_nested():
+                for field, value in changes.items():
+                    setattr(project, field, value)
+                project.version = Project.version + 1
+        except IntegrityError as e:
+            raise DuplicateEntryError(str(e.orig)) from e
+        self.db_session.refresh(project, ["version"])
+        return project
+
+    def exists_by_name(self, name: str, exclude_id: int | None = None) -> bool:
+        """Checks the name index for a project called `name` (other than `exclude_id`)."""
+        condition = Project.name == name
+        if exclude_id is not None:
+            condition = condition & (Project.id != exclude_id)
+        return self.db_session.execute(select(exists().where(condition))).scalar()
+
+    def ids_by_name(self, names) -> dict[str, int]:
+        """Looks up the ids of the projects called `names`, with one query on the name index."""
+        rows = self.db_session.execute(select(Project.name, Project.id).where(Project.name.in_(names)))
+        return dict(rows.all())
+
+    def count(self) -> int:
+        """Returns the number of projects."""
+        return self.db_session.execute(select(func.count()).select_from(Project)).scalar_one()
+
+    def list_version(self) -> tuple[int, int | None, int]:
+        """
+        (count, highest id, sum of versions) of the projects: it changes
+        whenever a project is created (new highest id), deleted (count) or
+        edited (versions), so it identifies the state of the project list.
+        This relies on ids never being reused (see the Project model):
+        otherwise deleting the newest project and creating another would
+        bring back an earlier value.
+        """
+        stmt = select(func.count(), func.max(Project.id), func.coalesce(func.sum(Project.version), 0))
+        return tuple(self.db_session.execute(stmt).one())
+
+    def tasks_version(self, project_id: int) -> int | None:
+        """The tasks_version of a project (a primary key lookup), or None if it does not exist."""
+        return self.db_session.execute(
+            select(Project.tasks_version).where(Project.id == project_id)
+        ).scalar_one_or_none()
+
+    def bump_tasks_version(self, project_ids) -> None:
+        """Marks the task lists of the given projects as changed, with one UPDATE."""
+        project_ids = set(project_ids)
+        if project_ids:
+            self.db_session.execute(
+                update(Project)
+                .where(Project.id.in_(project_ids))
+                .values(tasks_version=Project.tasks_version + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+
+    def reserve_task_slot(self, project_id: int, max_tasks: int) -> bool:
+        """
+        Increments the project's task_count if it is below `max_tasks`.
+
+        The check and the increment are one conditional UPDATE, which locks the
+        project row until the transaction ends, so concurrent creates for the
+        same project are serialized and can never overshoot the limit.
+        Returns False when the project is full or does not exist. The project's
+        tasks_version is bumped by the same statement.
+        """
+        stmt = (
+            update(Project)
+            .where(Project.id == project_id, Project.task_count < max_tasks)
+            .values(task_count=Project.task_count + 1, tasks_version=Project.tasks_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db_session.execute(stmt).rowcount == 1
+
+    def reserve_task_slots(self, requested: dict[int, int], max_tasks: int) -> dict[int, int]:
+        """
+        The batch form of reserve_task_slot: claims up to `requested[project_id]`
+        slots in each project, without going over `max_tasks`.
+
+        The projects are read and locked with one SELECT ... FOR UPDATE and
+        their counters are raised with one UPDATE. Returns the number of slots
+        granted per project; projects that do not exist are left out.
+        """
+        rows = self.db_session.execute(
+            select(Project.id, Project.task_count)
+            .where(Project.id.in_(requested))
+            .with_for_update()
+        ).all()
+        granted = {
+            project_id: max(0, min(requested[project_id], max_tasks - task_count))
+            for project_id, task_count in rows
+        }
+        increments = {project_id: n for project_id, n in granted.items() if n}
+        if increments:
+            self.db_session.execute(
+                update(Project)
+                .where(Project.id.in_(increments))
+                .values(
+                    task_count=Project.task_count + case(increments, value=Project.id),
+                    tasks_version=Project.tasks_version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        return granted
+
+    def release_task_slot(self, project_id: int) -> None:
+        """
+        Decrements the project's task_count after one of its tasks is deleted,
+        and bumps its tasks_version.
+        """
+        self.db_session.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(
+                task_count=case((Project.task_count > 0, Project.task_count - 1), else_=0),
+                tasks_version=Project.tasks_version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    def iter_with_tasks(self, batch_size: int = 1000) -> Iterator[Row]:
+        """
+        Streams every project joined with its tasks, ordered by project id then
+        task id; a project without tasks comes as one row with NULL task columns.
+
+        Only columns are selected and rows are fetched `batch_size` at a time
+        from a server-side cursor, so memory does not grow with the table size.
+        """
+        stmt = (
+            select(
+                Project.id.label("project_id"),
+                Project.name.label("project_name"),
+                Project.description.label("project_description"),
+                Task.id.label("task_id"),
+                Task.title,
+                Task.description,
+                Task.status,
+                Task.deadline,
+                Task.created_at,
+                Task.closed_at,
+            )
+            .outerjoin(Task, Task.project_id == Project.id)
+            .order_by(Project.id, Task.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.db_session.execute(stmt)
@@ -1,7 +1,25 @@
+import csv
+import datetime
+import io
+import re
+from sqlalchemy import Float, Integer, Row, and_, func, insert, literal, literal_column, or_, select, text, union_all, update
 from sqlalchemy.orm import Session
-from models.task import Task
+from models.project import Project
+from models.task import OPEN_TASK_PREDICATE, SEARCH_DOCUMENT_SQL, Task, TaskStatus
 from repositories.base_repository import BaseRepository
 
+# "Task is not done", spelled exactly like the partial index predicate.
+_OPEN_TASK = text(f"tasks.{OPEN_TASK_PREDICATE}")
+
+# Columns filter_tasks can sort by. Each has a (column, id) index.
+SORT_COLUMNS = {"id": Task.id, "deadline": Task.deadline, "created_at": Task.created_at}
+
+# Columns written by copy_in.
+COPY_COLUMNS = ["project_id", "title", "description", "status", "deadline", "created_at", "closed_at"]
+
+# Rank added to every task of a project whose name matches the search.
+PROJECT_NAME_MATCH_RANK = 0.1
+
 class TaskRepository(BaseRepository[Task]):
     """
     Repository for all data access logic related to Tasks.
@@ -9,8 +27,234 @@ class TaskRepository(BaseRepository[Task]):
     def __init__(self, db_session: Session):
         super().__init__(model=Task, db_session=db_session)
 
-    def list_for_project(self, project_id: int) -> list[Task]:
+    def list_for_project(self, project_id: int, after_id: int | None = None,
+                         limit: int | None = None) -> list[Row]:
+        """
+        A specific, efficient query to list the tasks of a given project,
+        ordered by id. `after_id`/`limit` page through them like BaseRepository.list.
+        Returns rows of the task columns, not ORM objects (see list_rows).
+        """
+        query = self.db_session.query(*self.list_columns).filter(Task.project_id == project_id)
+        if after_id is not None:
+            query = query.filter(Task.id > after_id)
+        return query.order_by(Task.id).limit(limit).all()
+
+    def filter_tasks(
+        self,
+        statuses: list[TaskStatus] | None = None,
+        project_ids: list[int] | None = None,
+        deadline_from: datetime.datetime | None = None,
+        deadline_to: datetime.datetime | None = None,
+        created_from: datetime.datetime | None = None,
+        created_to: datetime.datetime | None = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        after: tuple | None = None,
+        limit: int | None = None,
+    ) -> list[Row]:
+        """
+        Lists tasks matching every given filter, sorted by `sort_by` then id,
+        as one SQL query. Ranges are inclusive; None means "no filter".
+        Returns rows of the task columns, like list_for_project.
+
+        `after` is the (sort value, id) of the last row of the previous page
+        (keyset pagination). Tasks without a value for the sort column come
+        last in both directions.
         """
-        A specific, efficient query to list all tasks for a given project.
+        query = self.db_session.query(*self.list_columns)
+        if statuses:
+            query = query.filter(Task.status.in_(statuses))
+        if project_ids:
+            query = query.filter(Task.project_id.in_(project_ids))
+        if deadline_from is not None:
+            query = query.filter(Task.deadline >= deadline_from)
+        if deadline_to is not None:
+            query = query.filter(Task.deadline <= deadline_to)
+        if created_from is not None:
+            query = query.filter(Task.created_at >= created_from)
+        if created_to is not None:
+            query = query.filter(Task.created_at <= created_to)
+
+        column = SORT_COLUMNS[sort_by]
+        direction = (lambda c: c.desc()) if descending else (lambda c: c.asc())
+        if column is Task.id:
+            if after is not None:
+                query = query.filter(Task.id < after[1] if descending else Task.id > after[1])
+            return query.order_by(direction(Task.id)).limit(limit).all()
+
+        if after is not None:
+            query = query.filter(self._after_position(column, after, descending))
+        return (
+            query.order_by(direction(column).nulls_last(), direction(Task.id))
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def _after_position(column, after: tuple, descending: bool):
+        """The keyset condition "comes after (value, id)" for a nullable column."""
+        value, last_id = after
+        beyond_id = Task.id < last_id if descending else Task.id > last_id
+        if value is None:
+            # Already in the trailing NULL block: only later ids remain.
+            return and_(column.is_(None), beyond_id)
+        beyond_value = column < value if descending else column > value
+        return or_(beyond_value, and_(column == value, beyond_id), column.is_(None))
+
+    def search(self, query: str, limit: int = 50) -> list[tuple[Row, float]]:
+        """
+        Full-text search over task titles and descriptions, best match first.
+        Tasks whose project name matches the search rank higher too.
+
+        Uses the GIN index on PostgreSQL and the tasks_fts table on SQLite.
+        Returns (task row, rank) pairs.
+        """
+        if self.db_session.get_bind().dialect.name == "sqlite":
+            hits = self._sqlite_search_hits(query)
+        else:
+            hits = self._postgresql_search_hits(query)
+        if hits is None:
+            return []
+
+        matches = union_all(*hits).subquery()
+        rank = func.sum(matches.c.rank).label("rank")
+        ranked = self.db_session.execute(
+            select(matches.c.id, rank)
+            .group_by(matches.c.id)
+            .order_by(rank.desc(), matches.c.id)
+            .limit(limit)
+        ).all()
+
+        tasks = {
+            task.id: task
+            for task in self.db_session.query(*self.list_columns).filter(
+                Task.id.in_([row.id for row in ranked])
+            )
+        }
+        return [(tasks[row.id], float(row.rank)) for row in ranked if row.id in tasks]
+
+    @staticmethod
+    def _postgresql_search_hits(query: str):
+        """(id, rank) selects for text matches and project-name matches."""
+        tsquery = func.websearch_to_tsquery("simple", query)
+        document = literal_column(SEARCH_DOCUMENT_SQL)
+        text_hits = select(Task.id.label("id"), func.ts_rank(document, tsquery).label("rank")).where(
+            document.op("@@")(tsquery)
+        )
+        matching_projects = select(Project.id).where(
+            func.to_tsvector("simple", Project.name).op("@@")(tsquery)
+        )
+        project_hits = select(
+            Task.id.label("id"), literal(PROJECT_NAME_MATCH_RANK, Float).label("rank")
+        ).where(Task.project_id.in_(matching_projects))
+        return text_hits, project_hits
+
+    @staticmethod
+    def _sqlite_search_hits(query: str):
+        """
+        The SQLite counterpart of _postgresql_search_hits. Each word is quoted
+        so FTS5 operators in user input are matched literally.
+        """
+        words = re.findall(r"\w+", query)
+        if not words:
+            return None
+        match = " ".join('"' + word + '"' for word in words)
+        text_hits = (
+            text("SELECT rowid AS id, -bm25(tasks_fts) AS rank FROM tasks_fts WHERE tasks_fts MATCH :match")
+            .bindparams(match=match)
+            .columns(id=Integer, rank=Float)
+            .subquery()
+        )
+        matching_projects = select(Project.id).where(
+            *[Project.name.icontains(word, autoescape=True) for word in words]
+        )
+        project_hits = select(
+            Task.id.label("id"), literal(PROJECT_NAME_MATCH_RANK, Float).label("rank")
+        ).where(Task.project_id.in_(matching_projects))
+        return select(text_hits.c.id, text_hits.c.rank), project_hits
+
+    def copy_in(self, rows: list[dict]) -> None:
+        """
+        Inserts new tasks without reading anything back, the fastest way the
+        database allows: COPY ... FROM STDIN on PostgreSQL (psycopg2), one
+        executemany elsewhere. The rows have the COPY_COLUMNS keys, except
+        created_at which defaults to now and closed_at which defaults to None.
+        """
+        if not rows:
+            return
+        connection = self.db_session.connection()
+        if connection.dialect.name != "postgresql" or connection.dialect.driver != "psycopg2":
+            self.db_session.execute(insert(Task), rows)
+            return
+
+        # In CSV COPY an unquoted empty field is NULL and "" is an empty
+        # string, which is exactly what QUOTE_STRINGS writes for None and "".
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_STRINGS)
+        now = datetime.datetime.utcnow()
+        for row in rows:
+            row = {**row, "status": TaskStatus(row["status"]).name}
+            row.setdefault("created_at", now)
+            row.setdefault("closed_at", None)
+            writer.writerow([row[column] for column in COPY_COLUMNS])
+        buffer.seek(0)
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+
+    def list_open_deadlines(self) -> list[tuple[int, datetime.datetime]]:
+        """
+        Returns (id, deadline) pairs of every task that is not done and has a
+        deadline. Only the two columns are selected, no ORM objects are built.
+        """
+        stmt = select(Task.id, Task.deadline).where(
+            Task.deadline.is_not(None), _OPEN_TASK
+        )
+        return [tuple(row) for row in self.db_session.execute(stmt)]
+
+    def set_status(self, task_id: int, status: TaskStatus,
+                   closed_at: datetime.datetime | None) -> Row | None:
+        """
+        Changes only the status (and closed_at) of a task with a single
+        UPDATE ... RETURNING, without loading it first. A task that already
+        has this status is not touched. Returns the updated row of the task
+        columns, or None if the task does not exist or was left alone.
+        """
+        stmt = (
+            update(Task)
+            .where(Task.id == task_id, Task.status != status)
+            .values(status=status, closed_at=closed_at)
+            .returning(*self.list_columns)
+        )
+        return self.db_session.execute(stmt).first()
+
+    def close_overdue(self, cutoff: datetime.datetime, closed_at: datetime.datetime,
+                      chunk_size: int = 1000) -> list[tuple[int, int]]:
+        """
+        Marks every open task whose deadline is before `cutoff` as done, directly in
+        the database and without loading the rows into the session.
+
+        The update runs in chunks of `chunk_size` rows so a large backlog never
+        holds one huge statement; each chunk returns only the (id, project_id)
+        pairs of the affected tasks.
         """
-        return self.db_session.query(Task).filter(Task.project_id == project_id).all()
\ No newline at end of file
+        closed: list[tuple[int, int]] = []
+        while True:
+            overdue_ids = (
+                select(Task.id)
+                .where(Task.deadline < cutoff, _OPEN_TASK)
+                .limit(chunk_size)
+                .scalar_subquery()
+            )
+            stmt = (
+                update(Task)
+                .where(Task.id.in_(overdue_ids))
+                .values(status=TaskStatus.DONE, closed_at=closed_at)
+                .returning(Task.id, Task.project_id)
+                .execution_options(synchronize_session=False)
+            )
+            chunk = self.db_session.execute(stmt).all()
+            closed.extend(tuple(row) for row in chunk)
+            if len(chunk) < chunk_size:
+                return closed
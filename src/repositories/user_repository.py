@@ -1,3 +1,4 @@
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 from models.user import User
 from repositories.base_repository import BaseRepository
@@ -7,9 +8,26 @@ class UserRepository(BaseRepository[User]):
     """
     Repository for all data access logic related to Users.
     """
+    # Everything but the password hash, which must not end up in caches.
+    profile_columns = (
+        User.id, User.username, User.email, User.first_name, User.last_name,
+        User.is_active, User.created_at, User.updated_at,
+    )
+
     def __init__(self, db_session: Session):
         super().__init__(model=User, db_session=db_session)
 
+    def get_active_profile(self, user_id: int) -> Row | None:
+        """
+        The profile columns of a user as a plain row, or None if there is
+        no such user or they are not active.
+        """
+        return (
+            self.db_session.query(*self.profile_columns)
+            .filter(User.id == user_id, User.is_active.is_(True))
+            .first()
+        )
+
     def get_by_username(self, username: str) -> User:
         """
         Get a user by username.
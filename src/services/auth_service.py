@@ -1,15 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
+from services.password_hasher import password_hasher
+from cache.auth_cache import token_cache
 
 load_dotenv()
 
-# Initialize password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
@@ -24,13 +22,13 @@ class AuthService:
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash."""
-        return pwd_context.verify(plain_password, hashed_password)
+        """Verify a password against its hash (on the password hasher's worker processes)."""
+        return password_hasher.verify(plain_password, hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        """Generate a hash for the given password."""
-        return pwd_context.hash(password)
+        """Generate a hash for the given password (on the password hasher's worker processes)."""
+        return password_hasher.hash(password)
 
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -47,9 +45,16 @@ class AuthService:
 
     @staticmethod
     def verify_token(token: str) -> Optional[dict]:
-        """Verify a JWT token and return the payload."""
+        """
+        Verify a JWT token and return the payload. A token that was verified
+        before is answered from the token cache until it expires.
+        """
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
         except JWTError:
-            return None
\ No newline at end of file
+            return None
+        token_cache.put(token, payload)
+        return payload
\ No newline at end of file
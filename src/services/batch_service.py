@@ -0,0 +1,95 @@
+import os
+from contextlib import nullcontext
+from typing import Any, Callable
+from dotenv import load_dotenv
+from sqlalchemy import Row
+from models.project import Project
+from models.task import Task
+from services.project_service import ProjectService
+from services.task_service import TaskService
+from exceptions.repository_exceptions import RepositoryError
+from exceptions.service_exceptions import ProjectServiceError, TaskServiceError
+
+load_dotenv()
+MAX_BATCH_OPERATIONS = int(os.getenv("MAX_BATCH_OPERATIONS", 500))
+
+# What makes a single operation fail without failing the batch. The task
+# edits still report their validation errors as ValueError.
+OPERATION_ERRORS = (ProjectServiceError, TaskServiceError, RepositoryError, ValueError)
+
+
+class BatchService:
+    """
+    Runs a list of create/edit/delete operations on projects and tasks
+    through the project and task services, in the caller's session, so the
+    whole batch costs one commit instead of one per operation.
+
+    An operation is a dict with:
+      - "target": "project" or "task"
+      - "op": "create", "edit", "patch" or "delete"
+      - "id": the project or task to edit, patch or delete
+      - "data": the fields, as for the matching single endpoint
+    """
+    def __init__(self, project_service: ProjectService, task_service: TaskService):
+        self.project_service = project_service
+        self.task_service = task_service
+        self.session = project_service.project_repository.db_session
+        self._handlers = {
+            ("project", "create"): lambda op: project_service.create_project(op["data"]),
+            ("project", "edit"): lambda op: project_service.edit_project(op["id"], op["data"]),
+            ("project", "patch"): lambda op: project_service.patch_project(op["id"], op["data"]),
+            ("project", "delete"): lambda op: project_service.delete_project(op["id"]),
+            ("task", "create"): lambda op: task_service.create_task(op["data"]),
+            ("task", "edit"): lambda op: task_service.edit_task(op["id"], op["data"]),
+            ("task", "patch"): lambda op: task_service.patch_task(op["id"], op["data"]),
+            ("task", "delete"): lambda op: task_service.delete_task(op["id"]),
+        }
+
+    def run(self, operations: list[dict], atomic: bool = False,
+            present: Callable[[str, Project | Task | Row], Any] | None = None,
+            validate: Callable[[str, str, dict], dict] | None = None) -> tuple[bool, list]:
+        """
+        Applies the operations in order.
+
+        By default each operation runs in its own savepoint: one that fails
+        is undone alone and the others are kept. With `atomic`, the first
+        failure rolls the whole batch back and the rest is not run.
+
+        :param present: Called with the target and the affected project or
+            task right after each operation; its return value becomes the
+            result. Later operations may change the same object, so this is
+            the place to take a snapshot of it.
+        :param validate: Called with the target, the op and the data of each
+            operation before it runs; returns the data to pass to the service,
+            or raises ValueError to reject the operation. The services assume
+            well-typed data with known fields only, so callers taking data
+            from clients must pass it.
+        :return: Whether the changes are kept, and for each operation, in
+            order, its result, the error that rejected it, or None if it was
+            rolled back or not run.
+        """
+        results: list = [None] * len(operations)
+        for index, operation in enumerate(operations):
+            try:
+                # An atomic batch is undone as a whole, so it needs no savepoints.
+                with nullcontext() if atomic else self.session.begin_nested():
+                    item = self._apply(operation, validate)
+            except OPERATION_ERRORS as e:
+                if not atomic:
+                    results[index] = e
+                    continue
+                self.session.rollback()
+                return False, [None] * index + [e] + [None] * (len(operations) - index - 1)
+            results[index] = present(operation["target"], item) if present else item
+        return True, results
+
+    def _apply(self, operation: dict, validate: Callable[[str, str, dict], dict] | None) -> Project | Task | Row:
+        handler = self._handlers.get((operation.get("target"), operation.get("op")))
+        if handler is None:
+            raise ValueError(f"Unknown operation '{operation.get('op')}' on '{operation.get('target')}'.")
+        if operation["op"] != "create" and operation.get("id") is None:
+            raise ValueError(f"An '{operation['op']}' operation needs an id.")
+        data = operation.get("data") or {}
+        if validate is not None:
+            data = validate(operation["target"], operation["op"], data)
+        return handler({**operation, "data": data})
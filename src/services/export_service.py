@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import os
+from itertools import groupby
+from typing import Iterator
+from dotenv import load_dotenv
+from repositories.project_repository import ProjectRepository
+
+load_dotenv()
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+# An export chunk is flushed at EXPORT_BATCH_SIZE lines or at about this many characters.
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Column order of the CSV export: one line per task, with its project.
+CSV_COLUMNS = [
+    "project_id", "project_name", "project_description",
+    "task_id", "title", "description", "status", "deadline", "created_at", "closed_at",
+]
+TASK_FIELDS = ["title", "description", "status", "deadline", "created_at", "closed_at"]
+
+def _plain(value):
+    """Turns enums and datetimes into JSON/CSV friendly values."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+def _chunked(lines: Iterator[str], max_lines: int = EXPORT_BATCH_SIZE,
+             max_chars: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Joins lines into chunks, so a consumer handles one chunk per batch instead of one per row."""
+    chunk, size = [], 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if len(chunk) >= max_lines or size >= max_chars:
+            yield "".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk)
+
+
+class ExportService:
+    """
+    Streams all projects with their tasks, as NDJSON or CSV text.
+
+    The exports are generators over one streaming query, so they can be
+    written to a file or an HTTP response as they go. export() yields the
+    text in chunks of many lines: a StreamingResponse costs one thread hop
+    and one send per chunk, not per row.
+    """
+    FORMATS = ("ndjson", "csv")
+
+    def __init__(self, project_repository: ProjectRepository):
+        self.project_repository = project_repository
+
+    def export(self, fmt: str) -> Iterator[str]:
+        """Returns the export in `fmt` ("ndjson" or "csv") as chunks of text."""
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'. Must be one of: {self.FORMATS}")
+        return _chunked(self.export_ndjson() if fmt == "ndjson" else self.export_csv())
+
+    def export_ndjson(self) -> Iterator[str]:
+        """One JSON object per line (yielded one by one): a project with the list of its tasks."""
+        rows = self.project_repository.iter_with_tasks(batch_size=EXPORT_BATCH_SIZE)
+        for _, project_rows in groupby(rows, key=lambda row: row.project_id):
+            first = next(project_rows)
+            project = {
+                "id": first.project_id,
+                "name": first.project_name,
+                "description": first.project_description,
+                "tasks": [],
+            }
+            for row in (first, *project_rows):
+                if row.task_id is not None:
+                    task = {"id": row.task_id}
+                    task.update((field, _plain(getattr(row, field))) for field in TASK_FIELDS)
+                    project["tasks"].append(task)
+            yield json.dumps(project) + "\n"
+
+    def export_csv(self) -> Iterator[str]:
+        """A header line, then one line per task (or per project without tasks), yielded one by one."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def line(values) -> str:
+            writer.writerow(values)
+            text = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return text
+
+        yield line(CSV_COLUMNS)
+        for row in self.project_repository.iter_with_tasks(batch_size=EXPORT_BATCH_SIZE):
+            yield line([_plain(getattr(row, column)) for column in CSV_COLUMNS])
@@ -0,0 +1,45 @@
+import os
+import socket
+import datetime
+from dotenv import load_dotenv
+from repositories.lease_repository import LeaseRepository
+
+load_dotenv()
+SCHEDULER_LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", 60))
+
+
+def current_holder() -> str:
+    """Identifies this process (host + pid) as a lease holder."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseService:
+    """
+    Leader election for background jobs, backed by the scheduler_leases table.
+
+    A process holds a lease for SCHEDULER_LEASE_TTL_SECONDS and renews it (the
+    heartbeat) every time it runs the job. If the holder dies, the lease simply
+    expires and the next process that asks takes over, so failover never takes
+    longer than the TTL.
+    """
+    def __init__(self, lease_repository: LeaseRepository, holder: str | None = None):
+        self.lease_repository = lease_repository
+        self.holder = holder or current_holder()
+        self.ttl = datetime.timedelta(seconds=SCHEDULER_LEASE_TTL_SECONDS)
+
+    def acquire(self, name: str) -> bool:
+        """Takes or renews the lease. Returns False if another process holds it."""
+        now = datetime.datetime.utcnow()
+        return self.lease_repository.try_acquire(name, self.holder, now, self.ttl)
+
+    def seconds_left(self, name: str) -> float:
+        """How long until the current lease on `name` expires (0 if it has)."""
+        lease = self.lease_repository.get_by_name(name)
+        if lease is None:
+            return 0.0
+        remaining = lease.expires_at - datetime.datetime.utcnow()
+        return max(remaining.total_seconds(), 0.0)
+
+    def release(self, name: str) -> None:
+        """Gives the lease up so another process can take over immediately."""
+        self.lease_repository.release(name, self.holder, datetime.datetime.utcnow())
@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+load_dotenv()
+# bcrypt cost factor. Changing it makes existing hashes get rehashed at login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Processes doing the bcrypt work; 0 hashes in the calling thread.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    """
+    The CryptContext for `rounds`. Hashes made with any other cost are
+    reported as needing an update, which drives rehash-on-login.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+# These run in the worker processes, so they are module-level functions and
+# get the cost as an argument instead of relying on the worker's environment.
+def _hash(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> tuple[bool, Optional[str]]:
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded pool of worker processes.
+
+    bcrypt is tens of milliseconds of CPU per call. Done in a request thread
+    it competes for the GIL with every other request; in a separate process
+    the caller only waits, so a burst of logins does not slow down the other
+    endpoints. The pool has `workers` processes, so at most that many hashes
+    run at once and the rest queue.
+    """
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, rounds: int = BCRYPT_ROUNDS):
+        self.workers = workers
+        self.rounds = rounds
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        """Hashes a password with the configured cost."""
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """Checks a password against its hash."""
+        return self.verify_and_update(password, hashed_password)[0]
+
+    def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """
+        Checks a password against its hash. When it matches but the hash was
+        made with another cost, also returns a new hash to store; otherwise
+        the second value is None.
+        """
+        return self._run(_verify_and_update, password, hashed_password, self.rounds)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes; a later call starts new ones."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        return self._executor().submit(fn, *args).result()
+
+    def _executor(self) -> Executor:
+        # Started on first use, so the CLI and the scheduler never fork workers.
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+
+# The hasher shared by the services of this process.
+password_hasher = PasswordHasher()
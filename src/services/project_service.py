@@ -1,7 +1,10 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy import Row
 from repositories.project_repository import ProjectRepository
 from models.project import Project
+from cache.listing_cache import PROJECTS, listing_cache
+from exceptions.repository_exceptions import DuplicateEntryError
 from exceptions.service_exceptions import (
     ProjectLimitReachedError, 
     ProjectNameExistsError, 
@@ -35,18 +38,22 @@ class ProjectService:
         if len(data.get("description", "")) > 150:
             raise DescriptionTooLongError("Project description cannot be more than 150 characters.")
 
-        # To check for duplicates, we must list all projects and check in Python
-        # (This is a direct result of the minimal repository design)
-        all_projects = self.project_repository.list()
-        if any(p.name == name for p in all_projects):
+        # A single indexed query instead of a scan of all projects
+        if self.project_repository.exists_by_name(name):
             raise ProjectNameExistsError(f"A project with the name '{name}' already exists.")
-
-        if len(all_projects) >= MAX_NUMBER_OF_PROJECT:
-            raise ProjectLimitReachedError(f"Maximum number of projects ({MAX_NUMBER_OF_PROJECT}) reached.")
         # --- End of Validation Logic ---
 
-        # If all rules pass, ask the repository to add the project
-        return self.project_repository.add(data)
+        # If all rules pass, ask the repository to add the project. The limit
+        # is checked by the INSERT itself, and the unique constraint still
+        # catches a project with the same name created meanwhile.
+        try:
+            project = self.project_repository.add_within_limit(data, MAX_NUMBER_OF_PROJECT)
+        except DuplicateEntryError:
+            raise ProjectNameExistsError(f"A project with the name '{name}' already exists.")
+        if project is None:
+            raise ProjectLimitReachedError(f"Maximum number of projects ({MAX_NUMBER_OF_PROJECT}) reached.")
+        listing_cache.invalidate(PROJECTS, self.project_repository.db_session)
+        return project
 
     def edit_project(self, project_id: int, update_data: dict) -> Project:
         """
@@ -69,25 +76,80 @@ class ProjectService:
             raise DescriptionTooLongError("New description cannot be more than 150 characters.")
 
         # Check if another project (with a different ID) already has the new name
-        all_projects = self.project_repository.list()
-        if any(p.name == new_name and p.id != project_id for p in all_projects):
+        if self.project_repository.exists_by_name(new_name, exclude_id=project_id):
             raise ProjectNameExistsError(f"Another project with the name '{new_name}' already exists.")
         # --- End of Validation Logic ---
-        
-        # Directly modify the SQLAlchemy model object.
-        # The session will track this change. We do NOT call a repo.update() method.
-        project.name = new_name
-        project.description = new_description
-        
+
+        try:
+            project = self.project_repository.update(
+                project, {"name": new_name, "description": new_description}
+            )
+        except DuplicateEntryError:
+            raise ProjectNameExistsError(f"Another project with the name '{new_name}' already exists.")
+        listing_cache.invalidate(PROJECTS, self.project_repository.db_session)
+        return project
+
+    def patch_project(self, project_id: int, changes: dict) -> Project:
+        """
+        Partially updates a project: only "name" and/or "description", if
+        present in `changes`, are validated and assigned, and nothing is
+        written when neither actually changes.
+        """
+        project = self.project_repository.get(project_id)
+        if not project:
+            raise ProjectNotFoundError(f"Project with ID {project_id} not found.")
+
+        changes = {field: changes[field] for field in ("name", "description") if field in changes}
+        if "name" in changes:
+            new_name = changes["name"]
+            if not new_name or len(new_name.strip()) == 0:
+                raise EmptyTitleError("New project name cannot be empty.")
+            if len(new_name) > 30:
+                raise TitleTooLongError("New project name cannot be more than 30 characters.")
+            if self.project_repository.exists_by_name(new_name, exclude_id=project_id):
+                raise ProjectNameExistsError(f"Another project with the name '{new_name}' already exists.")
+        if changes.get("description") and len(changes["description"]) > 150:
+            raise DescriptionTooLongError("New description cannot be more than 150 characters.")
+
+        changes = {field: value for field, value in changes.items() if getattr(project, field) != value}
+        if not changes:
+            return project
+        try:
+            project = self.project_repository.update(project, changes)
+        except DuplicateEntryError:
+            raise ProjectNameExistsError(f"Another project with the name '{changes['name']}' already exists.")
+        listing_cache.invalidate(PROJECTS, self.project_repository.db_session)
         return project
 
     def delete_project(self, project_id: int) -> Project:
-        """Deletes a project."""
+        """
+        Deletes a project. Its tasks are removed by the database's
+        ON DELETE CASCADE, so they are never loaded into the session.
+        """
         deleted_project = self.project_repository.delete(project_id)
         if not deleted_project:
             raise ProjectNotFoundError(f"Project with ID {project_id} not found.")
+        session = self.project_repository.db_session
+        listing_cache.invalidate(PROJECTS, session)
+        listing_cache.invalidate(project_id, session)
         return deleted_project
 
-    def list_projects(self) -> list[Project]:
-        """Returns a list of all projects."""
-        return self.project_repository.list()
\ No newline at end of file
+    def list_version(self) -> tuple:
+        """A value that changes whenever a project is created, edited or deleted."""
+        return self.project_repository.list_version()
+
+    def list_projects(self, after_id: int | None = None, limit: int | None = None,
+                      version: tuple | None = None) -> list[Row]:
+        """
+        Returns the projects as (id, name, description) rows, optionally one
+        page (ids after `after_id`) at a time. Pages are served from the
+        listing cache when possible; `version` is the list_version the caller
+        has already read (e.g. for an ETag), so the page matches it.
+        """
+        if version is None:
+            version = self.list_version()
+        return listing_cache.get_or_load(
+            PROJECTS, version, (after_id, limit),
+            lambda: self.project_repository.list_rows(after_id=after_id, limit=limit),
+            self.project_repository.db_session,
+        )
@@ -1,9 +1,13 @@
 import os
 import datetime
+from collections import Counter
 from dotenv import load_dotenv
+from sqlalchemy import Row
 from repositories.task_repository import TaskRepository
 from repositories.project_repository import ProjectRepository
-from models.task import Task
+from models.task import Task, TaskStatus
+from commands.scheduler import deadline_scheduler
+from cache.listing_cache import listing_cache
 from exceptions.service_exceptions import (
     ProjectNotFoundError,
     TaskLimitReachedError,
@@ -12,12 +16,18 @@ from exceptions.service_exceptions import (
     EmptyTitleError,
     TitleTooLongError,
     DescriptionTooLongError,
-    TaskNotFoundError
+    TaskNotFoundError,
+    EmptySearchQueryError,
+    TaskServiceError
 )
 
 load_dotenv()
 MAX_NUMBER_OF_TASK = int(os.getenv("MAX_NUMBER_OF_TASK", 10))
+OVERDUE_SWEEP_CHUNK_SIZE = int(os.getenv("OVERDUE_SWEEP_CHUNK_SIZE", 1000))
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", 50))
 VALID_STATUSES = {"todo", "doing", "done"}
+# Fields patch_task accepts.
+PATCHABLE_FIELDS = ("title", "description", "deadline", "status")
 
 class TaskService:
     """
@@ -29,15 +39,103 @@ class TaskService:
 
     def create_task(self, data: dict) -> Task:
         """Creates a new task for a project after validation."""
-        project_id = data.get("project_id")
+        row = self._new_task_row(data)
+        project_id = row["project_id"]
+
+        # Claim a place in the project with one conditional update of its
+        # task counter; only on failure do we look at why.
+        if not self.project_repository.reserve_task_slot(project_id, MAX_NUMBER_OF_TASK):
+            if self.project_repository.get(project_id) is None:
+                raise ProjectNotFoundError(f"Project with ID {project_id} does not exist.")
+            raise TaskLimitReachedError(f"Project {project_id} has reached its task limit ({MAX_NUMBER_OF_TASK}).")
+
+        task = self.task_repository.add(row)
+        if task.status != TaskStatus.DONE:
+            deadline_scheduler.schedule(task.id, task.deadline)
+        self._invalidate_listings([project_id])
+        return task
+
+    def create_tasks(self, items: list[dict]) -> list[Task | TaskServiceError]:
+        """
+        Creates many tasks at once, with the same rules as create_task.
+
+        The batch is validated and checked against the project limits in one
+        pass (see _accept_batch), then the accepted tasks are inserted with
+        one statement.
+
+        :return: For each item, in order, the new task or the error that rejected it.
+        """
+        results, rows, accepted = self._accept_batch(items)
+        tasks = self.task_repository.add_many([rows[index] for index in accepted])
+        for index, task in zip(accepted, tasks):
+            results[index] = task
+            if task.status != TaskStatus.DONE:
+                deadline_scheduler.schedule(task.id, task.deadline)
+        self._invalidate_listings({task.project_id for task in tasks})
+        return results
+
+    def import_tasks(self, items: list[dict]) -> list[TaskServiceError | None]:
+        """
+        The bulk-load variant of create_tasks: same rules, but the accepted
+        tasks are copied in without being read back, and the deadline heap
+        is not updated. Callers reseed it once the import is done. Items may
+        carry the "created_at" and "closed_at" of an export, which are kept.
+
+        :return: For each item, in order, None or the error that rejected it.
+        """
+        results, rows, accepted = self._accept_batch(items)
+        now = datetime.datetime.utcnow()
+        for index in accepted:
+            rows[index]["created_at"] = items[index].get("created_at") or now
+            rows[index]["closed_at"] = items[index].get("closed_at")
+        self.task_repository.copy_in([rows[index] for index in accepted])
+        self._invalidate_listings({rows[index]["project_id"] for index in accepted})
+        return results
+
+    def _accept_batch(self, items: list[dict]) -> tuple[list, dict[int, dict], list[int]]:
+        """
+        Validates a batch of new tasks and reserves project slots for it.
+
+        Every item is validated first. Then the project existence and task
+        limits of the whole batch are checked with one query. Items are
+        accepted in order, so when a project runs out of room the later items
+        for it are rejected.
+
+        :return: The per-item results (errors so far, None elsewhere), the rows
+            to insert by item index, and the indexes of the accepted items.
+        """
+        results: list = [None] * len(items)
+        rows: dict[int, dict] = {}
+        for index, data in enumerate(items):
+            try:
+                rows[index] = self._new_task_row(data)
+            except TaskServiceError as e:
+                results[index] = e
+
+        requested = Counter(row["project_id"] for row in rows.values())
+        granted = self.project_repository.reserve_task_slots(requested, MAX_NUMBER_OF_TASK)
+        accepted: list[int] = []
+        for index, row in rows.items():
+            project_id = row["project_id"]
+            if project_id not in granted:
+                results[index] = ProjectNotFoundError(f"Project with ID {project_id} does not exist.")
+            elif granted[project_id] == 0:
+                results[index] = TaskLimitReachedError(
+                    f"Project {project_id} has reached its task limit ({MAX_NUMBER_OF_TASK})."
+                )
+            else:
+                granted[project_id] -= 1
+                accepted.append(index)
+        return results, rows, accepted
+
+    @staticmethod
+    def _new_task_row(data: dict) -> dict:
+        """Validates the data of a new task and returns the row to insert."""
         status = data.get("status", "todo")
         title = data.get("title", "")
         deadline_str = data.get("deadline")
 
         # --- Validation Logic from SimpleStorage ---
-        if self.project_repository.get(project_id) is None:
-            raise ProjectNotFoundError(f"Project with ID {project_id} does not exist.")
-
         if status not in VALID_STATUSES:
             raise InvalidTaskStatusError(f"Invalid status '{status}'. Must be one of: {VALID_STATUSES}")
         
@@ -45,19 +143,22 @@ class TaskService:
             raise EmptyTitleError("Task title cannot be empty.")
 
         # Validate deadline format
+        deadline = None
         if deadline_str:
             try:
-                datetime.datetime.strptime(deadline_str, "%Y-%m-%d")
+                deadline = datetime.datetime.strptime(deadline_str, "%Y-%m-%d")
             except ValueError:
                 raise InvalidDeadlineFormatError("Deadline must be in YYYY-MM-DD format.")
-
-        # Use the efficient repository method to check the task limit
-        tasks_in_project = self.task_repository.list_for_project(project_id)
-        if len(tasks_in_project) >= MAX_NUMBER_OF_TASK:
-            raise TaskLimitReachedError(f"Project {project_id} has reached its task limit ({MAX_NUMBER_OF_TASK}).")
         # --- End of Validation Logic ---
 
-        return self.task_repository.add(data)
+        # Store the parsed value; async drivers do not accept date strings.
+        return {
+            "project_id": data.get("project_id"),
+            "title": title,
+            "description": data.get("description"),
+            "status": TaskStatus(status),
+            "deadline": deadline,
+        }
 
     def edit_task(self, task_id: int, update_data: dict) -> Task:
         """Edits an existing task."""
@@ -78,9 +179,10 @@ class TaskService:
             raise ValueError("Task description cannot be more than 150 characters.")
         if new_status not in VALID_STATUSES:
             raise ValueError(f"Invalid status '{new_status}'. Must be one of: {VALID_STATUSES}")
+        new_deadline = None
         if new_deadline_str:
             try:
-                datetime.datetime.strptime(new_deadline_str, "%Y-%m-%d")
+                new_deadline = datetime.datetime.strptime(new_deadline_str, "%Y-%m-%d")
             except ValueError:
                 raise ValueError("New deadline must be in YYYY-MM-DD format.")
         # --- End of Validation ---
@@ -88,48 +190,197 @@ class TaskService:
         # Directly modify the model object
         task.title = new_title
         task.description = update_data.get("description")
-        task.deadline = new_deadline_str
+        task.deadline = new_deadline
         task.status = new_status
+
+        if new_status == "done":
+            deadline_scheduler.discard(task.id)
+        else:
+            deadline_scheduler.schedule(task.id, new_deadline)
+        self.project_repository.bump_tasks_version([task.project_id])
+        self._invalidate_listings([task.project_id])
         
         return task
     
+    def patch_task(self, task_id: int, changes: dict) -> Task | Row:
+        """
+        Partially updates a task: only the fields present in `changes` are
+        validated and assigned, and only those that really change end up in
+        the UPDATE. A None deadline removes it. Marking a task done sets
+        closed_at; reopening it clears closed_at.
+
+        A change of the status alone does not load the task: it is one
+        UPDATE ... RETURNING (see TaskRepository.set_status), and the
+        updated row is returned instead of the ORM object. When the status
+        is already the requested one, nothing is written.
+        """
+        values = self._patch_values(changes)
+        if set(values) == {"status"}:
+            return self._set_status(task_id, values["status"])
+
+        task = self.task_repository.get(task_id)
+        if not task:
+            raise TaskNotFoundError(f"Task with ID {task_id} not found.")
+        if "status" in values and values["status"] != task.status:
+            values["closed_at"] = self._closed_at(values["status"])
+        values = {field: value for field, value in values.items() if getattr(task, field) != value}
+        if not values:
+            return task
+
+        for field, value in values.items():
+            setattr(task, field, value)
+        if "status" in values or "deadline" in values:
+            self._reschedule(task.id, task.status, task.deadline)
+        self.project_repository.bump_tasks_version([task.project_id])
+        self._invalidate_listings([task.project_id])
+        return task
+
+    def _set_status(self, task_id: int, status: TaskStatus) -> Row:
+        """The fast path of patch_task for status-only changes."""
+        task = self.task_repository.set_status(task_id, status, closed_at=self._closed_at(status))
+        if task is None:
+            # Either there is no such task or it already has this status;
+            # in the latter case nothing changed, and no ETag is broken.
+            unchanged = self.task_repository.get(task_id)
+            if unchanged is None:
+                raise TaskNotFoundError(f"Task with ID {task_id} not found.")
+            return unchanged
+        self._reschedule(task.id, task.status, task.deadline)
+        self.project_repository.bump_tasks_version([task.project_id])
+        self._invalidate_listings([task.project_id])
+        return task
+
+    @staticmethod
+    def _patch_values(changes: dict) -> dict:
+        """Validates the supplied fields of a patch and returns the values to assign."""
+        values = {}
+        if "title" in changes:
+            title = changes["title"]
+            if not title or len(title.strip()) == 0:
+                raise EmptyTitleError("Task title cannot be empty.")
+            if len(title) > 30:
+                raise TitleTooLongError("Task title cannot be more than 30 characters.")
+            values["title"] = title
+        if "description" in changes:
+            description = changes["description"]
+            if description and len(description) > 150:
+                raise DescriptionTooLongError("Task description cannot be more than 150 characters.")
+            values["description"] = description
+        if "deadline" in changes:
+            deadline = None
+            if changes["deadline"]:
+                try:
+                    deadline = datetime.datetime.strptime(changes["deadline"], "%Y-%m-%d")
+                except ValueError:
+                    raise InvalidDeadlineFormatError("Deadline must be in YYYY-MM-DD format.")
+            values["deadline"] = deadline
+        if "status" in changes:
+            if changes["status"] not in VALID_STATUSES:
+                raise InvalidTaskStatusError(
+                    f"Invalid status '{changes['status']}'. Must be one of: {VALID_STATUSES}"
+                )
+            values["status"] = TaskStatus(changes["status"])
+        return values
+
+    @staticmethod
+    def _closed_at(status: TaskStatus) -> datetime.datetime | None:
+        return datetime.datetime.utcnow() if status == TaskStatus.DONE else None
+
+    @staticmethod
+    def _reschedule(task_id: int, status: TaskStatus, deadline: datetime.datetime | None) -> None:
+        """Keeps the deadline heap in line with a task's new status and deadline."""
+        if status == TaskStatus.DONE:
+            deadline_scheduler.discard(task_id)
+        else:
+            deadline_scheduler.schedule(task_id, deadline)
+
     def delete_task(self, task_id: int) -> Task:
         """Deletes a task."""
         deleted_task = self.task_repository.delete(task_id)
         if not deleted_task:
             raise TaskNotFoundError(f"Task with ID {task_id} not found.")
+        self.project_repository.release_task_slot(deleted_task.project_id)
+        deadline_scheduler.discard(task_id)
+        self._invalidate_listings([deleted_task.project_id])
         return deleted_task
 
-    def list_tasks_for_project(self, project_id: int) -> list[Task]:
-        """Lists all tasks for a given project."""
-        if self.project_repository.get(project_id) is None:
+    def list_tasks_for_project(self, project_id: int, after_id: int | None = None,
+                               limit: int | None = None, version: int | None = None) -> list[Row]:
+        """
+        Lists the tasks of a given project, optionally one page at a time.
+        Pages are served from the listing cache when possible, keyed by the
+        project's tasks_version. `version` is the tasks_version the caller
+        has already read (e.g. for an ETag), so the page matches it and a hit
+        costs no query; otherwise it is read here, which also checks that the
+        project exists.
+        """
+        if version is None:
+            version = self.tasks_version(project_id)
+        return listing_cache.get_or_load(
+            project_id, version, (after_id, limit),
+            lambda: self.task_repository.list_for_project(project_id, after_id=after_id, limit=limit),
+            self.task_repository.db_session,
+        )
+
+    def tasks_version(self, project_id: int) -> int:
+        """
+        The change counter of a project's task list; it is bumped by every
+        task change in the project, including the overdue sweep.
+        """
+        version = self.project_repository.tasks_version(project_id)
+        if version is None:
             raise ProjectNotFoundError(f"Project with ID {project_id} does not exist.")
-        return self.task_repository.list_for_project(project_id)
+        return version
 
-    def close_all_overdue_tasks(self) -> list[Task]:
+    def query_tasks(self, filters: dict) -> list[Row]:
         """
-        Finds all tasks across all projects that are past their deadline and 
-        are not yet 'done'. It updates their status to 'done'.
+        Lists tasks across projects matching the given filters. The keys are
+        the keyword arguments of TaskRepository.filter_tasks; "statuses" takes
+        the usual status names.
+        """
+        statuses = filters.get("statuses") or []
+        invalid = [s for s in statuses if s not in VALID_STATUSES]
+        if invalid:
+            raise InvalidTaskStatusError(f"Invalid status '{invalid[0]}'. Must be one of: {VALID_STATUSES}")
+        return self.task_repository.filter_tasks(
+            **{**filters, "statuses": [TaskStatus(s) for s in statuses]}
+        )
 
-        This is a batch operation intended for a scheduled job.
+    def search_tasks(self, query: str, limit: int | None = None) -> list[tuple[Row, float]]:
+        """
+        Searches task titles and descriptions (and project names).
+        Returns (task, rank) pairs, best match first.
+        """
+        if not query or not query.strip():
+            raise EmptySearchQueryError("Search query cannot be empty.")
+        return self.task_repository.search(query.strip(), limit=limit or SEARCH_RESULT_LIMIT)
 
-        :return: A list of the tasks that were just closed.
+    def close_all_overdue_tasks(self) -> list[int]:
         """
-        today = datetime.date.today()
-        closed_tasks = []
+        Finds all tasks across all projects that are past their deadline and 
+        are not yet 'done'. It updates their status to 'done'.
 
-        all_tasks = self.task_repository.list()
+        This is a batch operation intended for a scheduled job. The work is done
+        by a set-based UPDATE in the database, so the cost of a sweep does not
+        grow with the number of tasks that are NOT overdue.
 
-        for task in all_tasks:
-            if task.status == "done" or not task.deadline:
-                continue
+        :return: The IDs of the tasks that were just closed.
+        """
+        # A task is overdue once the day of its deadline has passed, so anything
+        # due before today's midnight gets closed.
+        cutoff = datetime.datetime.combine(datetime.date.today(), datetime.time.min)
+        closed = self.task_repository.close_overdue(
+            cutoff,
+            closed_at=datetime.datetime.utcnow(),
+            chunk_size=OVERDUE_SWEEP_CHUNK_SIZE,
+        )
+        project_ids = {project_id for _, project_id in closed}
+        self.project_repository.bump_tasks_version(project_ids)
+        self._invalidate_listings(project_ids)
+        return [task_id for task_id, _ in closed]
 
-            try:
-                deadline_date = datetime.datetime.strptime(task.deadline, "%Y-%m-%d").date()
-                if deadline_date < today:
-                    task.status = "done"
-                    closed_tasks.append(task)
-            except (ValueError, TypeError):
-                continue
-        
-        return closed_tasks
\ No newline at end of file
+    def _invalidate_listings(self, project_ids) -> None:
+        """Drops the cached task lists of the given projects."""
+        session = self.task_repository.db_session
+        for project_id in project_ids:
+            listing_cache.invalidate(project_id, session)
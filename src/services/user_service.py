@@ -1,11 +1,10 @@
 from models.user import User
-from passlib.context import CryptContext
+from services.password_hasher import password_hasher
+from cache.auth_cache import active_user_cache
+from sqlalchemy import Row
 from typing import Optional
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
 class UserService:
     """
     The service layer for handling all business logic related to users.
@@ -37,30 +36,51 @@ class UserService:
             raise ValueError(f"Email '{email}' already exists.")
 
         # Hash the password
-        hashed_password = pwd_context.hash(password)
+        hashed_password = password_hasher.hash(password)
         data["hashed_password"] = hashed_password
         
         # Remove plain password from data to avoid accidentally storing it
         if "password" in data:
             del data["password"]
 
-        return self.user_repository.add(data)
+        user = self.user_repository.add(data)
+        # The id may have been looked up (and cached as unknown) before.
+        active_user_cache.invalidate(user.id, self.user_repository.db_session)
+        return user
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
-        """Authenticate user by username and password."""
+        """
+        Authenticate user by username and password. A hash made with an older
+        bcrypt cost is replaced by one with the current cost.
+        """
         user = self.user_repository.get_by_username(username)
-        if not user or not self.verify_password(password, user.hashed_password):
+        if not user:
+            return None
+        verified, new_hash = password_hasher.verify_and_update(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            user.hashed_password = new_hash
         return user
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash."""
-        return pwd_context.verify(plain_password, hashed_password)
+        return password_hasher.verify(plain_password, hashed_password)
 
     def get_user(self, user_id: int) -> Optional[User]:
         """Get a user by ID."""
         return self.user_repository.get(user_id)
 
+    def get_active_user(self, user_id: int) -> Optional[Row]:
+        """
+        The profile of an active user (see UserRepository.get_active_profile),
+        from the active-user cache when possible. None if the user does not
+        exist or is not active.
+        """
+        return active_user_cache.get_or_load(
+            user_id, lambda: self.user_repository.get_active_profile(user_id)
+        )
+
     def update_user(self, user_id: int, update_data: dict) -> User:
         """Update a user."""
         user = self.user_repository.get(user_id)
@@ -72,10 +92,11 @@ class UserService:
             if value is not None:
                 if field == "password":
                     # If password is being updated, hash it
-                    setattr(user, "hashed_password", pwd_context.hash(value))
+                    setattr(user, "hashed_password", password_hasher.hash(value))
                 else:
                     setattr(user, field, value)
 
+        active_user_cache.invalidate(user_id, self.user_repository.db_session)
         return user
 
     def delete_user(self, user_id: int) -> User:
@@ -83,4 +104,5 @@ class UserService:
         deleted_user = self.user_repository.delete(user_id)
         if not deleted_user:
             raise ValueError(f"User with ID {user_id} not found.")
+        active_user_cache.invalidate(user_id, self.user_repository.db_session)
         return deleted_user
\ No newline at end of file